@@ -9,16 +9,24 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 import subprocess
 import threading
+import queue
+import itertools
 import os
-import sys
 import time
-import webbrowser
-from pathlib import Path
 
-# Get project root
-PROJECT_ROOT = Path(__file__).parent.parent
-TEST_FILE = PROJECT_ROOT / "tests" / "e2e" / "test_navigation_route_following.py"
-REPORTS_DIR = PROJECT_ROOT / "reports" / "e2e"
+from runner_common import (
+    PROJECT_ROOT, TEST_FILE, PYTHON_CMD, BROWSER,
+    probe_status, wait_appium, get_latest_report, viewable_report, classify, iter_lines,
+)
+
+# Opt-in pre-warmed test interpreter (POSIX only, see test_worker.py)
+WORKER_FILE = PROJECT_ROOT / "app" / "test_worker.py"
+WORKER_EXIT_MARKER = "__TEST_WORKER_EXIT__"
+PREWARM_WORKER = os.getenv("ROADLORDS_PREWARM") == "1" and hasattr(os, "fork")
+
+# Log widget keeps the newest LOG_MAX_LINES, trimmed once it grows past LOG_TRIM_LINES
+LOG_MAX_LINES = 5000
+LOG_TRIM_LINES = 6000
 
 
 class RoadlordsTestRunner:
@@ -28,14 +36,21 @@ class RoadlordsTestRunner:
         self.root.geometry("700x500")
         self.root.resizable(True, True)
 
-        # Status variables
-        self.device_connected = False
-        self.appium_running = False
+        # Status variables (device/appium/report refreshed together by _refresh_state)
+        self._state = {"device": None, "appium": False, "report": None}
         self.test_running = False
-        self.latest_report = None
+
+        # Worker threads queue (message, tag) here; drained into the log widget in batches
+        self._log_q = queue.Queue()
+
+        # Pre-warmed test worker - imports test dependencies while the user is idle
+        self._worker = None
+        if PREWARM_WORKER:
+            self._start_worker()
 
         self.setup_ui()
         self.check_status()
+        self._drain_log_queue()
 
     def setup_ui(self):
         # Main frame with padding
@@ -107,61 +122,83 @@ class RoadlordsTestRunner:
         self.log_text.insert(tk.END, f"[{timestamp}] {message}\n", tag)
         self.log_text.see(tk.END)
 
+    def _flush_log_queue(self):
+        """Write all queued worker output to the log, one insert per run of same-tag lines."""
+        items = []
+        try:
+            while True:
+                items.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+
+        if not items:
+            return
+
+        timestamp = time.strftime("%H:%M:%S")
+        for tag, group in itertools.groupby(items, key=lambda item: item[1]):
+            self.log_text.insert(tk.END, "".join(f"[{timestamp}] {message}\n" for message, _ in group), tag)
+
+        # Drop oldest lines so long runs don't keep growing the Text widget
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > LOG_TRIM_LINES:
+            self.log_text.delete("1.0", f"{line_count - LOG_MAX_LINES}.0")
+
+        self.log_text.see(tk.END)
+
+    def _drain_log_queue(self):
+        """Periodically flush the worker log queue (Tk main thread)."""
+        self._flush_log_queue()
+        self.root.after(50, self._drain_log_queue)
+
     def check_status(self):
         """Check device and Appium status."""
         self.log("Checking status...")
 
-        # Check device in background
-        threading.Thread(target=self._check_device, daemon=True).start()
-        threading.Thread(target=self._check_appium, daemon=True).start()
+        # Check everything in one background worker
+        threading.Thread(target=self._refresh_state, daemon=True).start()
 
-    def _check_device(self):
-        """Check if Android device is connected."""
+    def _refresh_state(self, on_done=None):
+        """Collect device, Appium and latest report status in one pass (background thread)."""
+        state = {"device": None, "device_error": None, "appium": False, "appium_error": None, "report": None}
+
+        # Check connected Android device and Appium server
         try:
-            result = subprocess.run(["adb", "devices"], capture_output=True, text=True, timeout=5)
-            lines = result.stdout.strip().split("\n")
-            # Filter out header and empty lines
-            devices = [l for l in lines[1:] if l.strip() and "device" in l and "offline" not in l]
-
-            if devices:
-                device_id = devices[0].split()[0]
-                self.device_connected = True
-                self.root.after(0, lambda: self.device_status.config(
-                    text=f"Connected ({device_id})", foreground="green"))
-                self.root.after(0, lambda: self.log(f"Device found: {device_id}", "success"))
-            else:
-                self.device_connected = False
-                self.root.after(0, lambda: self.device_status.config(
-                    text="Not connected", foreground="red"))
-                self.root.after(0, lambda: self.log("No device connected. Please connect your Android phone.", "warning"))
+            state["device"], state["appium"] = probe_status()
         except Exception as e:
-            self.device_connected = False
-            self.root.after(0, lambda: self.device_status.config(
-                text="Error checking", foreground="red"))
-            self.root.after(0, lambda: self.log(f"Error checking device: {e}", "error"))
+            state["device_error"] = state["appium_error"] = e
 
-        self.root.after(0, self._update_buttons)
+        # Check for existing reports
+        state["report"] = get_latest_report()
 
-    def _check_appium(self):
-        """Check if Appium server is running."""
-        try:
-            result = subprocess.run(["pgrep", "-f", "appium"], capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                self.appium_running = True
-                self.root.after(0, lambda: self.appium_status.config(
-                    text="Running", foreground="green"))
-                self.root.after(0, lambda: self.log("Appium server is running", "success"))
-            else:
-                self.appium_running = False
-                self.root.after(0, lambda: self.appium_status.config(
-                    text="Not running", foreground="red"))
-                self.root.after(0, lambda: self.log("Appium not running. Click 'Start Appium' to start.", "warning"))
-        except Exception as e:
-            self.appium_running = False
-            self.root.after(0, lambda: self.appium_status.config(
-                text="Error checking", foreground="red"))
+        self.root.after(0, self._apply_state, state, on_done)
+
+    def _apply_state(self, state, on_done=None):
+        """Publish a status snapshot to all widgets (Tk main thread)."""
+        self._state = state
 
-        self.root.after(0, self._update_buttons)
+        if state["device_error"]:
+            self.device_status.config(text="Error checking", foreground="red")
+            self.log(f"Error checking device: {state['device_error']}", "error")
+        elif state["device"]:
+            self.device_status.config(text=f"Connected ({state['device']})", foreground="green")
+            self.log(f"Device found: {state['device']}", "success")
+        else:
+            self.device_status.config(text="Not connected", foreground="red")
+            self.log("No device connected. Please connect your Android phone.", "warning")
+
+        if state["appium_error"]:
+            self.appium_status.config(text="Error checking", foreground="red")
+        elif state["appium"]:
+            self.appium_status.config(text="Running", foreground="green")
+            self.log("Appium server is running", "success")
+        else:
+            self.appium_status.config(text="Not running", foreground="red")
+            self.log("Appium not running. Click 'Start Appium' to start.", "warning")
+
+        self._update_buttons()
+
+        if on_done:
+            on_done()
 
     def _update_buttons(self):
         """Update button states based on status."""
@@ -169,18 +206,14 @@ class RoadlordsTestRunner:
             self.run_btn.config(state=tk.DISABLED)
             self.appium_btn.config(state=tk.DISABLED)
         else:
-            if self.device_connected and self.appium_running:
+            if self._state["device"] and self._state["appium"]:
                 self.run_btn.config(state=tk.NORMAL)
             else:
                 self.run_btn.config(state=tk.DISABLED)
             self.appium_btn.config(state=tk.NORMAL)
 
-        # Check for existing reports
-        if REPORTS_DIR.exists():
-            reports = list(REPORTS_DIR.glob("stress_report_*.html"))
-            if reports:
-                self.latest_report = max(reports, key=lambda p: p.stat().st_mtime)
-                self.report_btn.config(state=tk.NORMAL)
+        if self._state["report"]:
+            self.report_btn.config(state=tk.NORMAL)
 
     def start_appium(self):
         """Start Appium server."""
@@ -201,8 +234,10 @@ class RoadlordsTestRunner:
                 )
 
                 # Wait for startup
-                time.sleep(3)
-                self.root.after(0, lambda: self.log("Appium started!", "success"))
+                if wait_appium():
+                    self.root.after(0, lambda: self.log("Appium started!", "success"))
+                else:
+                    self.root.after(0, lambda: self.log("Appium not listening yet - still starting?", "warning"))
                 self.root.after(0, self.check_status)
 
             except Exception as e:
@@ -224,83 +259,93 @@ class RoadlordsTestRunner:
 
         def _run():
             try:
-                # Change to project directory
-                os.chdir(PROJECT_ROOT)
-
-                # Activate venv and run test
-                env = os.environ.copy()
-                venv_python = PROJECT_ROOT / "venv" / "bin" / "python"
-
-                if venv_python.exists():
-                    python_cmd = str(venv_python)
+                worker = self._worker
+                if worker and worker.poll() is None:
+                    returncode = self._run_in_worker(worker)
                 else:
-                    python_cmd = sys.executable
-
-                process = subprocess.Popen(
-                    [python_cmd, str(TEST_FILE)],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    cwd=str(PROJECT_ROOT)
-                )
+                    returncode = self._run_direct()
 
-                # Read output line by line
-                for line in iter(process.stdout.readline, ''):
-                    if line:
-                        line = line.rstrip()
-                        # Determine tag based on content
-                        if "ERROR" in line or "FAILED" in line:
-                            tag = "error"
-                        elif "ARRIVED" in line or "SUCCESS" in line or "PASS" in line:
-                            tag = "success"
-                        elif "WARNING" in line:
-                            tag = "warning"
-                        else:
-                            tag = "info"
-                        self.root.after(0, lambda l=line, t=tag: self.log(l, t))
-
-                process.wait()
-
-                if process.returncode == 0:
-                    self.root.after(0, lambda: self.log("=" * 50, "success"))
-                    self.root.after(0, lambda: self.log("TEST COMPLETED SUCCESSFULLY!", "success"))
-                    self.root.after(0, lambda: self.log("=" * 50, "success"))
+                if returncode == 0:
+                    self._log_q.put(("=" * 50, "success"))
+                    self._log_q.put(("TEST COMPLETED SUCCESSFULLY!", "success"))
+                    self._log_q.put(("=" * 50, "success"))
                 else:
-                    self.root.after(0, lambda: self.log("=" * 50, "error"))
-                    self.root.after(0, lambda: self.log(f"TEST FAILED (exit code: {process.returncode})", "error"))
-                    self.root.after(0, lambda: self.log("=" * 50, "error"))
+                    self._log_q.put(("=" * 50, "error"))
+                    self._log_q.put((f"TEST FAILED (exit code: {returncode})", "error"))
+                    self._log_q.put(("=" * 50, "error"))
 
             except Exception as e:
-                self.root.after(0, lambda: self.log(f"Error running test: {e}", "error"))
+                self._log_q.put((f"Error running test: {e}", "error"))
             finally:
                 self.root.after(0, self._test_finished)
 
         threading.Thread(target=_run, daemon=True).start()
 
+    def _run_direct(self):
+        """Run the test in a fresh interpreter and return its exit code."""
+        process = subprocess.Popen(
+            [PYTHON_CMD, str(TEST_FILE)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            cwd=str(PROJECT_ROOT)
+        )
+
+        # Read output in chunks, split into lines
+        for line in iter_lines(process.stdout.fileno()):
+            self._log_q.put((line, classify(line)))
+
+        return process.wait()
+
+    def _start_worker(self):
+        """Start the pre-warmed test worker."""
+        try:
+            self._worker = subprocess.Popen(
+                [PYTHON_CMD, str(WORKER_FILE)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=str(PROJECT_ROOT)
+            )
+        except Exception:
+            self._worker = None
+
+    def _run_in_worker(self, worker):
+        """Run the test in the pre-warmed worker and return its exit code."""
+        worker.stdin.write(b"RUN\n")
+        worker.stdin.flush()
+
+        for line in iter_lines(worker.stdout.fileno()):
+            if line.startswith(WORKER_EXIT_MARKER):
+                return int(line.split()[-1])
+            self._log_q.put((line, classify(line)))
+
+        # Worker died mid-run - next run goes through a fresh one
+        self._start_worker()
+        return worker.wait()
+
     def _test_finished(self):
         """Called when test finishes."""
+        self._flush_log_queue()
         self.test_running = False
         self.progress.stop()
         self._update_buttons()
 
-        # Find and open latest report
-        if REPORTS_DIR.exists():
-            reports = list(REPORTS_DIR.glob("stress_report_*.html"))
-            if reports:
-                self.latest_report = max(reports, key=lambda p: p.stat().st_mtime)
-                self.report_btn.config(state=tk.NORMAL)
+        # Refresh status to pick up the new report, then open it
+        threading.Thread(target=self._refresh_state, args=(self._open_new_report,), daemon=True).start()
 
-                # Ask to open report
-                self.log(f"Report saved: {self.latest_report.name}")
-                self.log("Opening report...", "success")
-                self.open_report()
+    def _open_new_report(self):
+        """Announce and open the report produced by the finished test."""
+        if self._state["report"]:
+            self.log(f"Report saved: {self._state['report'].name}")
+            self.log("Opening report...", "success")
+            self.open_report()
 
     def open_report(self):
         """Open the latest report in browser."""
-        if self.latest_report and self.latest_report.exists():
-            webbrowser.open(f"file://{self.latest_report}")
-            self.log(f"Opened report: {self.latest_report.name}", "success")
+        latest_report = self._state["report"]
+        if latest_report and latest_report.exists():
+            BROWSER.open(f"file://{viewable_report(latest_report)}")
+            self.log(f"Opened report: {latest_report.name}", "success")
         else:
             self.log("No report found", "warning")
 
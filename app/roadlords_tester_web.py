@@ -7,17 +7,30 @@ Opens in your browser - no tkinter needed.
 import subprocess
 import threading
 import os
-import sys
 import time
-import webbrowser
 import json
-from pathlib import Path
-from flask import Flask, render_template_string, jsonify, Response
+import queue
+import hashlib
+import zlib
+from urllib.parse import quote
+from flask import Flask, jsonify, Response, request, send_from_directory
 
-# Get project root
-PROJECT_ROOT = Path(__file__).parent.parent
-TEST_FILE = PROJECT_ROOT / "tests" / "e2e" / "test_navigation_route_following.py"
-REPORTS_DIR = PROJECT_ROOT / "reports" / "e2e"
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    dumps = json.dumps
+
+from runner_common import (
+    PROJECT_ROOT, TEST_FILE, REPORTS_DIR, PYTHON_CMD, BROWSER,
+    appium_port_open, probe_status, wait_appium, get_latest_report, classify, iter_lines,
+)
+
+# SSE batching for /run-test output
+SSE_BATCH_LINES = 16
+SSE_FLUSH_SECONDS = 0.05
 
 app = Flask(__name__)
 
@@ -221,7 +234,7 @@ HTML_TEMPLATE = """
                 .then(r => r.json())
                 .then(data => {
                     log(data.message, data.success ? 'success' : 'error');
-                    setTimeout(checkStatus, 3000);
+                    checkStatus();
                 });
         }
 
@@ -240,13 +253,10 @@ HTML_TEMPLATE = """
 
             eventSource.onmessage = function(e) {
                 const data = JSON.parse(e.data);
-                if (data.line) {
-                    let type = 'info';
-                    if (data.line.includes('ERROR') || data.line.includes('FAILED')) type = 'error';
-                    else if (data.line.includes('ARRIVED') || data.line.includes('PASS') || data.line.includes('SUCCESS')) type = 'success';
-                    else if (data.line.includes('WARNING')) type = 'warning';
-                    log(data.line, type);
-                }
+                // Lines arrive as [text, type] pairs, classified by the server
+                (data.lines || []).forEach(function(item) {
+                    if (item[0]) log(item[0], item[1]);
+                });
                 if (data.finished) {
                     testRunning = false;
                     document.getElementById('run-btn').disabled = false;
@@ -285,38 +295,48 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Page has no template variables - encode once and let the browser revalidate via ETag
+INDEX_HTML = HTML_TEMPLATE.encode()
+INDEX_ETAG = hashlib.sha1(INDEX_HTML).hexdigest()
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    response = Response(INDEX_HTML, mimetype="text/html", headers={"Cache-Control": "public, max-age=300"})
+    response.set_etag(INDEX_ETAG)
+    return response.make_conditional(request)
+
+def appium_alive():
+    """Check if Appium is running - probe its port, fall back to pgrep (e.g. still starting up)."""
+    if appium_port_open():
+        return True
+    result = subprocess.run(["pgrep", "-f", "appium"], capture_output=True, timeout=5)
+    return result.returncode == 0
+
+# /status result cache - absorbs polling from several tabs / rapid refreshes
+STATUS_TTL = 0.5
+_status_cache = {"t": 0.0, "val": None}
+_status_lock = threading.Lock()
 
 @app.route('/status')
 def status():
-    # Check device
-    device = None
-    try:
-        result = subprocess.run(["adb", "devices"], capture_output=True, text=True, timeout=5)
-        lines = result.stdout.strip().split("\n")
-        devices = [l for l in lines[1:] if l.strip() and "device" in l and "offline" not in l]
-        if devices:
-            device = devices[0].split()[0]
-    except:
-        pass
+    with _status_lock:
+        now = time.monotonic()
+        if _status_cache["val"] and now - _status_cache["t"] < STATUS_TTL:
+            return jsonify(_status_cache["val"])
 
-    # Check Appium
-    appium = False
-    try:
-        result = subprocess.run(["pgrep", "-f", "appium"], capture_output=True, timeout=5)
-        appium = result.returncode == 0
-    except:
-        pass
+        # Check device and Appium
+        device, appium = None, False
+        try:
+            device, appium = probe_status()
+        except:
+            pass
 
-    # Check for reports
-    has_report = False
-    if REPORTS_DIR.exists():
-        reports = list(REPORTS_DIR.glob("stress_report_*.html"))
-        has_report = len(reports) > 0
+        # Check for reports
+        has_report = get_latest_report() is not None
 
-    return jsonify({"device": device, "appium": appium, "has_report": has_report})
+        val = {"device": device, "appium": appium, "has_report": has_report}
+        _status_cache.update(t=time.monotonic(), val=val)
+        return jsonify(val)
 
 def find_appium():
     """Find appium executable - check common locations"""
@@ -382,8 +402,7 @@ def start_appium():
     try:
         # Check if Appium is already running - don't kill it!
         try:
-            result = subprocess.run(["pgrep", "-f", "appium"], capture_output=True, timeout=5)
-            if result.returncode == 0:
+            if appium_alive():
                 return jsonify({"success": True, "message": "Appium already running"})
         except:
             pass
@@ -411,50 +430,92 @@ def start_appium():
                 start_new_session=True,
                 env=env
             )
+        started = wait_appium()
+        _status_cache["t"] = 0.0  # next /status must re-probe
+        if started:
+            return jsonify({"success": True, "message": f"Appium started from {appium_path}"})
         return jsonify({"success": True, "message": f"Appium starting from {appium_path} (log: {log_file})"})
     except Exception as e:
         return jsonify({"success": False, "message": str(e)})
 
+def gzip_stream(chunks):
+    """Gzip a streaming response, sync-flushing after each chunk so events still arrive promptly."""
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
 @app.route('/run-test')
 def run_test():
     def generate():
         try:
-            os.chdir(PROJECT_ROOT)
-            venv_python = PROJECT_ROOT / "venv" / "bin" / "python"
-            python_cmd = str(venv_python) if venv_python.exists() else sys.executable
-
             process = subprocess.Popen(
-                [python_cmd, str(TEST_FILE)],
+                [PYTHON_CMD, str(TEST_FILE)],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
                 cwd=str(PROJECT_ROOT)
             )
 
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    yield f"data: {json.dumps({'line': line.rstrip()})}\n\n"
+            # Pump output lines from a reader thread so batches can be flushed on a deadline
+            lines = queue.Queue()
+
+            def pump():
+                for line in iter_lines(process.stdout.fileno()):
+                    lines.put([line, classify(line)])
+                lines.put(None)
+
+            threading.Thread(target=pump, daemon=True).start()
+
+            # Send up to SSE_BATCH_LINES lines per event, or whatever arrived within SSE_FLUSH_SECONDS
+            finished = False
+            while not finished:
+                batch = [lines.get()]  # Block until output arrives
+                deadline = time.monotonic() + SSE_FLUSH_SECONDS
+                while batch[-1] is not None and len(batch) < SSE_BATCH_LINES:
+                    try:
+                        batch.append(lines.get(timeout=max(0, deadline - time.monotonic())))
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    finished = True
+                    batch.pop()
+                if batch:
+                    yield f"data: {dumps({'lines': batch})}\n\n"
 
             process.wait()
             success = process.returncode == 0
-            yield f"data: {json.dumps({'finished': True, 'success': success})}\n\n"
+            yield f"data: {dumps({'finished': True, 'success': success})}\n\n"
 
         except Exception as e:
-            yield f"data: {json.dumps({'line': f'Error: {e}', 'finished': True, 'success': False})}\n\n"
+            yield f"data: {dumps({'lines': [[f'Error: {e}', 'error']], 'finished': True, 'success': False})}\n\n"
+
+    # Log lines are very repetitive - compress them if the browser accepts gzip
+    stream = generate()
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        stream = gzip_stream(stream)
+        headers["Content-Encoding"] = "gzip"
 
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(stream, mimetype='text/event-stream', headers=headers)
 
 @app.route('/open-report', methods=['POST'])
 def open_report():
-    if REPORTS_DIR.exists():
-        reports = list(REPORTS_DIR.glob("stress_report_*.html"))
-        if reports:
-            latest = max(reports, key=lambda p: p.stat().st_mtime)
-            webbrowser.open(f"file://{latest}")
-            return jsonify({"success": True, "message": f"Opened: {latest.name}"})
+    latest = get_latest_report()
+    if latest:
+        # Over /reports rather than file:// - a browser won't render a .html.gz from disk
+        BROWSER.open(f"{request.host_url}reports/{quote(latest.name)}")
+        return jsonify({"success": True, "message": f"Opened: {latest.name}"})
     return jsonify({"success": False, "message": "No report found"})
 
+@app.route('/reports/<path:name>')
+def report_file(name):
+    """Serve a report and the chart data / video next to it - a .html.gz as gzip-encoded HTML."""
+    response = send_from_directory(REPORTS_DIR, name)
+    if name.endswith(".html.gz"):
+        response.mimetype = "text/html"
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
 if __name__ == "__main__":
     print("\n" + "="*50)
     print("  Roadlords Test Runner")
@@ -463,6 +524,11 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop\n")
 
     # Open browser after short delay
-    threading.Timer(1.5, lambda: webbrowser.open("http://localhost:5050")).start()
+    threading.Timer(1.5, lambda: BROWSER.open("http://localhost:5050")).start()
 
-    app.run(host='127.0.0.1', port=5050, debug=False, threaded=True)
+    # Prefer waitress (bounded thread pool, keep-alive) over Flask's dev server
+    try:
+        from waitress import serve
+        serve(app, host='127.0.0.1', port=5050, threads=8, connection_limit=64, channel_timeout=120)
+    except ImportError:
+        app.run(host='127.0.0.1', port=5050, debug=False, threaded=True)
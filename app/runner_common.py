@@ -0,0 +1,198 @@
+"""
+Shared helpers for the Roadlords test runners (roadlords_tester.py and
+roadlords_tester_web.py): device / Appium probes, report lookup and test
+output handling.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import webbrowser
+from pathlib import Path
+
+# Get project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_FILE = PROJECT_ROOT / "tests" / "e2e" / "test_navigation_route_following.py"
+REPORTS_DIR = PROJECT_ROOT / "reports" / "e2e"
+# generate_html_report(compress=True) writes .html.gz
+REPORT_SUFFIXES = (".html", ".html.gz")
+
+# Python used to run the test (project venv if present), resolved once
+_VENV_PYTHON = PROJECT_ROOT / "venv" / "bin" / "python"
+PYTHON_CMD = str(_VENV_PYTHON) if _VENV_PYTHON.exists() else sys.executable
+
+ADB_SERVER = ("127.0.0.1", 5037)
+APPIUM_SERVER = ("127.0.0.1", 4723)
+
+# Resolve the browser backend once instead of on every open
+try:
+    BROWSER = webbrowser.get()
+except webbrowser.Error:
+    BROWSER = webbrowser
+
+
+def _recv_exact(sock, n):
+    """Read exactly n bytes from socket."""
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("adb server closed connection")
+        data += chunk
+    return data
+
+
+def _parse_devices(lines):
+    """Get serials in "device" state from "<serial>\t<state>" lines."""
+    return [l.split()[0] for l in lines if l.strip() and l.split()[-1] == "device"]
+
+
+def adb_host_devices():
+    """
+    Get serials of connected devices via the ADB host protocol.
+
+    Talks to the local adb server directly (like the `adb` client does) instead
+    of forking `adb devices`. The server closes the connection after answering
+    `host:devices`, so each call opens a fresh localhost socket.
+
+    Raises:
+        OSError: If the adb server is not running or doesn't answer in time
+            (ConnectionError for a FAIL reply).
+        ValueError: If the reply is malformed.
+    """
+    cmd = b"host:devices"
+    with socket.create_connection(ADB_SERVER, timeout=2) as sock:
+        sock.sendall(b"%04x%s" % (len(cmd), cmd))
+        status = _recv_exact(sock, 4)
+        payload = _recv_exact(sock, int(_recv_exact(sock, 4), 16)).decode()
+    if status != b"OKAY":
+        raise ConnectionError(payload)
+    return _parse_devices(payload.splitlines())
+
+
+def appium_port_open():
+    """Check if Appium answers on its port."""
+    try:
+        with socket.create_connection(APPIUM_SERVER, timeout=0.25):
+            return True
+    except OSError:
+        return False
+
+
+def wait_appium(timeout=5.0):
+    """Poll the Appium port every 100 ms until it accepts connections; False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if appium_port_open():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def _combined_probe():
+    """
+    Run `adb devices` and the Appium pgrep in a single shell (fallback for the socket probes).
+
+    `adb devices` also starts the adb server if needed. The `[a]ppium` pattern
+    keeps pgrep from matching this shell's own command line.
+    """
+    result = subprocess.run(
+        ["sh", "-c", "adb devices; echo ---; pgrep -f '[a]ppium' >/dev/null && echo APPIUM_UP || echo APPIUM_DOWN"],
+        capture_output=True, text=True, timeout=10
+    )
+    adb_out, _, appium_out = result.stdout.partition("---")
+    return _parse_devices(adb_out.strip().split("\n")[1:]), "APPIUM_UP" in appium_out
+
+
+def probe_status():
+    """
+    Get (device_id or None, appium_running).
+
+    Uses the adb server socket and the Appium port; whatever those can't settle
+    (adb server down, Appium not listening yet) is checked with one combined shell call.
+    """
+    try:
+        devices = adb_host_devices()
+    except (OSError, ValueError):  # server down, timeout, reset, FAIL or garbled reply
+        devices = None
+    appium = appium_port_open()
+
+    if devices is None or not appium:
+        fallback_devices, fallback_appium = _combined_probe()
+        if devices is None:
+            devices = fallback_devices
+        appium = appium or fallback_appium
+
+    return (devices[0] if devices else None), appium
+
+
+# Latest report cache - only rescanned when the reports directory changes
+_report_cache = {"dir_mtime": None, "latest": None}
+
+
+def get_latest_report():
+    """Get newest stress report, rescanning REPORTS_DIR only when its mtime changes."""
+    try:
+        dir_mtime = REPORTS_DIR.stat().st_mtime
+    except FileNotFoundError:
+        _report_cache.update(dir_mtime=None, latest=None)
+        return None
+
+    if dir_mtime != _report_cache["dir_mtime"]:
+        # scandir hands back cached DirEntry stats - no Path objects or second stat() per file
+        latest, latest_mtime = None, -1
+        with os.scandir(REPORTS_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith("stress_report_") and entry.name.endswith(REPORT_SUFFIXES) and entry.is_file():
+                    mtime = entry.stat().st_mtime
+                    if mtime > latest_mtime:
+                        latest, latest_mtime = Path(entry.path), mtime
+        _report_cache.update(dir_mtime=dir_mtime, latest=latest)
+    return _report_cache["latest"]
+
+
+def viewable_report(report):
+    """
+    Path of a report that opens from file:// - a compressed one is inflated
+    to a hidden sibling (so its relative chart data and video links still
+    resolve), once per report version.
+    """
+    if not report.name.endswith(".gz"):
+        return report
+    html = report.with_name(f".{report.name[:-3]}")
+    if not html.exists() or html.stat().st_mtime < report.stat().st_mtime:
+        with gzip.open(report, "rb") as src, open(html, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    return html
+
+
+# Output line classification (priority: error > success > warning > info)
+_TAG_RE = re.compile(r"(?P<error>ERROR|FAILED)|(?P<success>ARRIVED|SUCCESS|PASS)|(?P<warning>WARNING)")
+
+
+def classify(line):
+    """Get log tag for a line of test output."""
+    tags = {m.lastgroup for m in _TAG_RE.finditer(line)}
+    for tag in ("error", "success", "warning"):
+        if tag in tags:
+            return tag
+    return "info"
+
+
+def iter_lines(fd, chunk_size=65536):
+    """Yield lines from a pipe, reading it in large chunks instead of per-line readline()."""
+    pending = b""
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        *complete, pending = (pending + chunk).split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8", "replace").rstrip()
+    if pending:
+        yield pending.decode("utf-8", "replace").rstrip()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed test worker for the Roadlords Test Runner.
+
+Imports the heavy test dependencies (Appium, Selenium, NumPy, ...) once, then
+waits for "RUN" lines on stdin and forks a child per run, so each test starts
+with everything already imported. After every run it prints
+"__TEST_WORKER_EXIT__ <exit code>".
+
+POSIX only (needs os.fork). Started by roadlords_tester.py when
+ROADLORDS_PREWARM=1 is set.
+"""
+
+import os
+import sys
+import runpy
+import traceback
+from pathlib import Path
+
+# Get project root
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_FILE = PROJECT_ROOT / "tests" / "e2e" / "test_navigation_route_following.py"
+EXIT_MARKER = "__TEST_WORKER_EXIT__"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Warm up test dependencies. The test module itself is not imported here -
+# it looks for a connected device at import time.
+import appium.webdriver  # noqa: E402,F401
+import selenium.webdriver.support.ui  # noqa: E402,F401
+import src.gps  # noqa: E402,F401
+import src.utils  # noqa: E402,F401
+
+
+def run_once() -> int:
+    """Run the test in a forked child and return its exit code."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            runpy.run_path(str(TEST_FILE), run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def main():
+    for command in sys.stdin:
+        if command.strip() == "RUN":
+            code = run_once()
+            print(f"{EXIT_MARKER} {code}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """GPS Mock Controller module for Roadlords Automation."""
 
-from .gps_mock_controller import GPSMockController, set_gps_location, play_gps_route
+from .gps_mock_controller import GPSMockController, RoutePlan, set_gps_location, play_gps_route, simulate_routes
 
-__all__ = ['GPSMockController', 'set_gps_location', 'play_gps_route']
+__all__ = ['GPSMockController', 'RoutePlan', 'set_gps_location', 'play_gps_route', 'simulate_routes']
@@ -11,16 +11,134 @@ Usage:
     gps.stop()
 """
 
+import asyncio
+import base64
+import glob
+import os
+import re
+import shlex
 import subprocess
+import threading
 import time
 import logging
+from collections import deque
 from pathlib import Path
 from typing import Optional, Tuple
+from dataclasses import dataclass
 import xml.etree.ElementTree as ET
 from math import radians, sin, cos, sqrt, atan2
 
+import numpy as np
+
+try:
+    from lxml import etree as lxml_etree  # optional - faster C parser with tag filtering
+except ImportError:
+    lxml_etree = None
+
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_M = 6371000
+
+# Fix in `dumpsys location` output, e.g. "Location[gps 48.148600,17.107700 hAcc=5 ..."
+_DUMPSYS_FIX = re.compile(r"Location\[\w+ (-?\d+\.\d+),(-?\d+\.\d+)")
+
+
+def _haversine_vec(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized haversine - element-wise distances in meters between coordinate arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_M * c
+
+
+@dataclass
+class RoutePlan:
+    """
+    Route waypoints with segment distances, computed once.
+
+    Stored as parallel arrays - segment i runs from point i to point i + 1.
+    Playback positions are spaced exactly distance_per_update apart along the
+    route, so the simulated speed is constant across segments.
+    """
+    lats: np.ndarray  # (N,) degrees
+    lons: np.ndarray  # (N,) degrees
+    seg_dists: np.ndarray  # (N - 1,) meters
+    cum_dists: np.ndarray  # (N,) meters from route start to each point
+    distance_per_update: float  # meters
+
+    @classmethod
+    def from_waypoints(cls, waypoints, distance_per_update: float) -> "RoutePlan":
+        """
+        Build a plan from (lat, lon) waypoints.
+
+        Args:
+            waypoints: (lat, lon) tuples or an (N, 2) array.
+            distance_per_update: Distance travelled per update in meters.
+        """
+        wp = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+        if not np.isfinite(wp).all():
+            raise ValueError("Waypoints contain NaN/inf coordinates")
+
+        # Own contiguous copies - clipped in place without touching the caller's array
+        lats = wp[:, 0].copy()
+        lons = wp[:, 1].copy()
+        np.clip(lats, -90.0, 90.0, out=lats)
+        np.clip(lons, -180.0, 180.0, out=lons)
+
+        seg_dists = _haversine_vec(lats[:-1], lons[:-1], lats[1:], lons[1:])
+        cum_dists = np.concatenate([[0.0], np.cumsum(seg_dists)]) if len(lats) else np.empty(0)
+        return cls(lats, lons, seg_dists, cum_dists, distance_per_update)
+
+    @property
+    def total_distance(self) -> float:
+        """Route length in meters."""
+        return float(self.cum_dists[-1]) if len(self.cum_dists) else 0.0
+
+    @property
+    def num_updates(self) -> int:
+        """Number of location updates needed to play the route (incl. final position)."""
+        if len(self.lats) == 0:
+            return 0
+        return len(self._offsets()) + 1
+
+    def _offsets(self) -> np.ndarray:
+        """Distance along the route of every playback position before the final one."""
+        return np.arange(0.0, self.total_distance, self.distance_per_update)
+
+    def points(self) -> np.ndarray:
+        """
+        Every position sent during playback, as an (M, 2) array of (lat, lon).
+
+        Positions sit at 0, d, 2d, ... meters along the route (d = distance_per_update);
+        the final waypoint is appended last.
+        """
+        if len(self.lats) == 0:
+            return np.empty((0, 2))
+
+        t = self._offsets()
+        # Segment containing each offset (zero-length segments are never picked)
+        segment = np.searchsorted(self.cum_dists, t, side='right') - 1
+        fraction = (t - self.cum_dists[segment]) / self.seg_dists[segment]
+
+        lats = self.lats[segment] + (self.lats[segment + 1] - self.lats[segment]) * fraction
+        lons = self.lons[segment] + (self.lons[segment + 1] - self.lons[segment]) * fraction
+        return np.column_stack([np.append(lats, self.lats[-1]), np.append(lons, self.lons[-1])])
+
+
+class _ShellCommand:
+    """A command submitted to the persistent ADB shell, completed by the reader thread."""
+
+    __slots__ = ("command", "output", "done")
+
+    def __init__(self, command: str):
+        self.command = command
+        self.output = ""
+        self.done = threading.Event()
+
 
 class GPSMockController:
     """Controller for GPS Mock Android app via ADB broadcasts."""
@@ -33,6 +151,22 @@ class GPSMockController:
     ACTION_STOP = f"{PACKAGE}.STOP"
     ACTION_SET = f"{PACKAGE}.SET"
 
+    # Prebuilt shell command prefixes for the fixed-schema broadcasts
+    _SET_CMD = f"am broadcast -n {RECEIVER} -a {ACTION_SET}"
+    _START_CMD = f"am broadcast -n {RECEIVER} -a {ACTION_START}"
+    _STOP_CMD = f"am broadcast -n {RECEIVER} -a {ACTION_STOP}"
+
+    # Printed on its own line after every command in the persistent shell,
+    # followed by its exit code
+    END_MARKER = "__END__"
+    # Max commands in flight in the persistent shell
+    PIPELINE_WINDOW = 8
+    # Seconds to wait for a command's end marker (or a free pipeline slot)
+    COMMAND_TIMEOUT = 30.0
+    # GPX files up to this size are streamed through the persistent shell
+    # instead of a separate `adb push`
+    SHELL_PUSH_MAX_BYTES = 4 * 1024 * 1024
+
     def __init__(self, device_id: Optional[str] = None):
         """
         Initialize GPS Mock Controller.
@@ -41,14 +175,22 @@ class GPSMockController:
             device_id: Optional ADB device ID. If None, uses first connected device.
         """
         self.device_id = device_id
+        self._argv_prefix = ("adb", "-s", device_id) if device_id else ("adb",)
         self._service_started = False
+        self._shell: Optional[subprocess.Popen] = None  # persistent `adb shell`, opened lazily
+        self._shell_reader: Optional[threading.Thread] = None
+        self._pending: deque[_ShellCommand] = deque()  # submitted, not yet completed (FIFO)
+        self._pending_cv = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _adb_cmd(self, *args) -> str:
         """Execute ADB command and return output."""
-        cmd = ["adb"]
-        if self.device_id:
-            cmd.extend(["-s", self.device_id])
-        cmd.extend(args)
+        cmd = [*self._argv_prefix, *args]
 
         result = subprocess.run(cmd, capture_output=True, text=True)
         if result.returncode != 0:
@@ -56,9 +198,129 @@ class GPSMockController:
         # Return both stdout and stderr (adb push outputs to stderr)
         return result.stdout + result.stderr
 
-    def _broadcast(self, action: str, **extras) -> bool:
-        """Send broadcast to GPS Mock receiver."""
-        args = ["shell", "am", "broadcast", "-n", self.RECEIVER, "-a", action]
+    def _open_shell(self):
+        """Start the persistent `adb shell` session and its output reader."""
+        self.close()
+
+        self._shell = subprocess.Popen(
+            [*self._argv_prefix, "shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        self._shell_reader = threading.Thread(target=self._read_shell, args=(self._shell,), daemon=True)
+        self._shell_reader.start()
+
+    def _read_shell(self, shell: subprocess.Popen):
+        """Reader thread - hand each command's output back as its end marker arrives."""
+        output = []
+        for line in iter(shell.stdout.readline, ""):
+            if not line.startswith(self.END_MARKER):
+                output.append(line)
+                continue
+
+            with self._pending_cv:
+                entry = self._pending.popleft() if self._pending else None
+                self._pending_cv.notify_all()
+            if entry:
+                # Drop the newline printed ahead of the marker
+                entry.output = "".join(output)[:-1]
+                if line.strip() != f"{self.END_MARKER}0":
+                    # First line only - a GPX push carries the whole file
+                    command = entry.command.partition("\n")[0]
+                    logger.warning(f"ADB shell command failed: {command}\n{entry.output}")
+                entry.done.set()
+            output = []
+
+        # Shell exited (device gone?) - fail whatever is still pending
+        with self._pending_cv:
+            if self._pending:
+                logger.warning(f"ADB shell exited with {len(self._pending)} command(s) pending\n{''.join(output)}")
+            while self._pending:
+                self._pending.popleft().done.set()
+            self._pending_cv.notify_all()
+
+    def _submit(self, command: str, window: int) -> _ShellCommand:
+        """
+        Write a command to the persistent shell without waiting for its output.
+
+        Blocks while `window` commands are already in flight (raises
+        subprocess.TimeoutExpired if none completes within COMMAND_TIMEOUT).
+        Saves spawning a new adb process (and adbd connection) per command.
+        """
+        if self._shell is None or self._shell.poll() is not None:
+            self._open_shell()
+
+        entry = _ShellCommand(command)
+        with self._pending_cv:
+            free = self._pending_cv.wait_for(lambda: len(self._pending) < max(1, window), self.COMMAND_TIMEOUT)
+            if free:
+                self._pending.append(entry)
+        if not free:
+            self._abort_shell(command)
+
+        try:
+            # Newline first so the marker starts a line even after output
+            # that does not end in one
+            self._shell.stdin.write(f"{command}; printf '\\n{self.END_MARKER}%d\\n' $?\n")
+            self._shell.stdin.flush()
+        except OSError as e:
+            logger.warning(f"ADB shell closed: {e}")
+            self.close()
+        return entry
+
+    def _shell_cmd(self, command: str) -> str:
+        """
+        Run a command in the persistent `adb shell` session and return its output.
+
+        Raises subprocess.TimeoutExpired if it doesn't finish within COMMAND_TIMEOUT.
+        """
+        entry = self._submit(command, self.PIPELINE_WINDOW)
+        if not entry.done.wait(self.COMMAND_TIMEOUT):
+            self._abort_shell(command)
+        return entry.output
+
+    def _abort_shell(self, command: str):
+        """
+        Give up on a shell that stopped answering: fail everything in flight,
+        kill it (the next command opens a new one) and raise TimeoutExpired.
+        """
+        # First line only - a GPX push carries the whole file
+        command = command.partition("\n")[0]
+        logger.warning(f"ADB shell gave no end marker within {self.COMMAND_TIMEOUT}s: {command}")
+        with self._pending_cv:
+            while self._pending:
+                self._pending.popleft().done.set()
+            self._pending_cv.notify_all()
+        if self._shell is not None:
+            self._shell.kill()
+        self.close()
+        raise subprocess.TimeoutExpired(command, self.COMMAND_TIMEOUT)
+
+    def close(self):
+        """Close the persistent ADB shell (waits for commands still in flight)."""
+        if self._shell is None:
+            return
+
+        shell, self._shell = self._shell, None
+        try:
+            shell.stdin.close()
+            shell.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            shell.kill()
+        self._shell_reader.join(timeout=2)
+        shell.stdout.close()
+
+    def _broadcast(self, action: str, window: int = 0, **extras) -> bool:
+        """
+        Send broadcast to GPS Mock receiver.
+
+        With window > 0 the broadcast is only queued (up to `window` in flight)
+        and True is returned without waiting for the result.
+        """
+        args = ["am", "broadcast", "-n", self.RECEIVER, "-a", action]
 
         for key, value in extras.items():
             if isinstance(value, float):
@@ -68,8 +330,26 @@ class GPSMockController:
             elif isinstance(value, str):
                 args.extend(["-e", key, value])
 
-        output = self._adb_cmd(*args)
-        return "Broadcast completed" in output
+        return self._send_broadcast(" ".join(shlex.quote(arg) for arg in args), window)
+
+    def _send_broadcast(self, command: str, window: int = 0) -> bool:
+        """Run a ready-made `am broadcast` command (see _broadcast for `window`)."""
+        if window > 0:
+            self._submit(command, window)
+            return True
+
+        return "Broadcast completed" in self._shell_cmd(command)
+
+    # Fast paths for the known broadcasts - no per-call type dispatch or quoting
+
+    def _broadcast_set(self, lat: float, lon: float, window: int = 0) -> bool:
+        return self._send_broadcast(f"{self._SET_CMD} --ef lat {float(lat)} --ef lon {float(lon)}", window)
+
+    def _broadcast_start(self, gpx: str, speed: float) -> bool:
+        return self._send_broadcast(f"{self._START_CMD} -e gpx {shlex.quote(gpx)} --ef speed {float(speed)}")
+
+    def _broadcast_stop(self) -> bool:
+        return self._send_broadcast(self._STOP_CMD)
 
     def start_service(self) -> bool:
         """
@@ -81,8 +361,9 @@ class GPSMockController:
         """
         logger.info("Starting GPS Mock service...")
 
-        # Launch MainActivity to get foreground exemption
-        output = self._adb_cmd("shell", "am", "start", "-n", self.MAIN_ACTIVITY)
+        # Launch MainActivity to get foreground exemption (over the persistent
+        # shell the broadcasts use, not a new adb process)
+        output = self._shell_cmd(f"am start -n {self.MAIN_ACTIVITY}")
 
         if "Error" in output:
             logger.error(f"Failed to start GPS Mock: {output}")
@@ -94,22 +375,58 @@ class GPSMockController:
         logger.info("GPS Mock service started")
         return True
 
-    def set_location(self, lat: float, lon: float) -> bool:
+    def set_location(self, lat: float, lon: float, window: int = 0) -> bool:
         """
         Set static GPS location.
 
         Args:
             lat: Latitude in decimal degrees.
             lon: Longitude in decimal degrees.
+            window: If > 0, don't wait for the broadcast result; allow up to
+                this many updates in flight.
 
         Returns:
-            True if location was set successfully.
+            True if location was set successfully (or queued, with window > 0).
         """
         if not self._service_started:
             self.start_service()
 
         logger.info(f"Setting GPS location to: {lat}, {lon}")
-        return self._broadcast(self.ACTION_SET, lat=lat, lon=lon)
+        return self._broadcast_set(lat, lon, window)
+
+    def wait_until_position(
+        self,
+        lat: float,
+        lon: float,
+        tol: float = 1e-4,
+        timeout: float = 5.0,
+        poll_interval: float = 0.1
+    ) -> bool:
+        """
+        Wait until the device reports a location fix at the given position.
+
+        Args:
+            lat: Expected latitude in decimal degrees.
+            lon: Expected longitude in decimal degrees.
+            tol: Allowed difference per coordinate, in degrees (1e-4 ~ 11 m).
+            timeout: Maximum time to wait in seconds.
+            poll_interval: Time between `dumpsys location` reads in seconds.
+
+        Returns:
+            True if a matching fix was reported before the timeout.
+        """
+        # Scan the dump here rather than piping it through grep: grep exits 1
+        # while there is no fix yet, which the shell would log as a failure
+        command = "dumpsys location"
+        deadline = time.monotonic() + timeout
+        while True:
+            for fix_lat, fix_lon in _DUMPSYS_FIX.findall(self._shell_cmd(command)):
+                if abs(float(fix_lat) - lat) <= tol and abs(float(fix_lon) - lon) <= tol:
+                    return True
+            if time.monotonic() + poll_interval > deadline:
+                logger.warning(f"Device did not report position {lat}, {lon} within {timeout}s")
+                return False
+            time.sleep(poll_interval)
 
     def play_gpx_route(self, gpx_path: str, speed_kmh: float = 80.0) -> bool:
         """
@@ -126,12 +443,12 @@ class GPSMockController:
             self.start_service()
 
         logger.info(f"Starting GPX playback: {gpx_path} at {speed_kmh} km/h")
-        return self._broadcast(self.ACTION_START, gpx=gpx_path, speed=speed_kmh)
+        return self._broadcast_start(gpx_path, speed_kmh)
 
     def stop(self) -> bool:
         """Stop GPS mock playback."""
         logger.info("Stopping GPS Mock")
-        return self._broadcast(self.ACTION_STOP)
+        return self._broadcast_stop()
 
     def push_gpx_file(self, local_path: str, remote_path: str = "/sdcard/Download/route.gpx") -> bool:
         """
@@ -144,7 +461,18 @@ class GPSMockController:
         Returns:
             True if file was pushed successfully.
         """
-        output = self._adb_cmd("push", local_path, remote_path)
+        data = Path(local_path).read_bytes()
+        if len(data) <= self.SHELL_PUSH_MAX_BYTES:
+            # Heredoc through the open shell - no adb process. `$?` on the line
+            # after the terminator is base64's exit status
+            output = self._shell_cmd(
+                f"base64 -d > {shlex.quote(remote_path)} << '__GPX_EOF__'\n"
+                f"{base64.encodebytes(data).decode('ascii')}"
+                "__GPX_EOF__\n"
+                "[ $? -eq 0 ] && echo pushed"
+            )
+        else:
+            output = self._adb_cmd("push", local_path, remote_path)
         success = "pushed" in output.lower() or "transferred" in output.lower()
         if success:
             logger.info(f"Pushed GPX file to {remote_path}")
@@ -163,39 +491,55 @@ class GPSMockController:
         This provides more control than the built-in GPX playback.
 
         Args:
-            waypoints: List of (lat, lon) tuples.
+            waypoints: List of (lat, lon) tuples (or an (N, 2) array, e.g. from parse_gpx).
             speed_kmh: Speed in km/h.
             update_interval: How often to update position (seconds).
         """
+        asyncio.run(self.simulate_route_smooth_async(waypoints, speed_kmh, update_interval))
+
+    async def simulate_route_smooth_async(
+        self,
+        waypoints: list[Tuple[float, float]],
+        speed_kmh: float = 80.0,
+        update_interval: float = 0.5
+    ):
+        """
+        Async version of simulate_route_smooth.
+
+        Waits with asyncio.sleep, so other tasks (other devices, monitors) keep
+        running on the same event loop - see simulate_routes.
+        """
         if not self._service_started:
-            self.start_service()
+            await asyncio.to_thread(self.start_service)
 
         speed_ms = speed_kmh / 3.6  # Convert to m/s
         distance_per_update = speed_ms * update_interval
 
-        for i in range(len(waypoints) - 1):
-            from_point = waypoints[i]
-            to_point = waypoints[i + 1]
-
-            segment_distance = self._haversine_distance(*from_point, *to_point)
-            steps = max(1, int(segment_distance / distance_per_update))
+        if len(waypoints) == 0:
+            return
 
-            for step in range(steps):
-                fraction = step / steps
-                lat = from_point[0] + (to_point[0] - from_point[0]) * fraction
-                lon = from_point[1] + (to_point[1] - from_point[1]) * fraction
+        # Interpolate the whole route up front - the loop below only does I/O
+        plan = RoutePlan.from_waypoints(waypoints, distance_per_update)
+        logger.info(f"Simulating route: {plan.total_distance / 1000:.1f} km, {plan.num_updates} updates")
+        points = plan.points().tolist()
 
-                self.set_location(lat, lon)
-                time.sleep(update_interval)
+        # Pipeline the updates - enough in flight to cover ~1 s of adb latency
+        window = int(1.0 / update_interval) + 2
+        for lat, lon in points[:-1]:
+            # Wait for room in the window here rather than blocking the loop in _submit
+            while len(self._pending) >= window:
+                await asyncio.sleep(0.01)
+            self.set_location(lat, lon, window=window)
+            await asyncio.sleep(update_interval)
 
-        # Set final position
-        if waypoints:
-            self.set_location(*waypoints[-1])
+        # Set final position (waits for everything queued before it)
+        await asyncio.to_thread(self.set_location, *points[-1])
 
     @staticmethod
     def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points in meters."""
-        R = 6371000  # Earth radius in meters
+        # Scalar math beats NumPy for a single pair - see _haversine_vec for batches
+        R = EARTH_RADIUS_M
 
         lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
         dlat = lat2 - lat1
@@ -207,53 +551,108 @@ class GPSMockController:
         return R * c
 
     @staticmethod
-    def parse_gpx(gpx_path: str) -> list[Tuple[float, float]]:
+    def parse_gpx(gpx_path: str) -> np.ndarray:
         """
-        Parse GPX file and return list of waypoints.
+        Parse GPX file and return its track points.
+
+        The result is cached next to the file as `<gpx>.<mtime_ns>.npy`, so
+        repeat calls memory-map the binary array instead of parsing XML again.
+        Editing the GPX changes its mtime and invalidates the cache.
 
         Args:
             gpx_path: Path to local GPX file.
 
         Returns:
-            List of (lat, lon) tuples.
+            (N, 2) float64 array of (lat, lon) - can be passed straight to simulate_route_smooth.
+            Read-only when loaded from the cache.
         """
-        tree = ET.parse(gpx_path)
-        root = tree.getroot()
-
-        # Handle GPX namespace
-        ns = {'gpx': 'http://www.topografix.com/GPX/1/1'}
+        gpx = Path(gpx_path)
+        cache_path = gpx.with_name(f"{gpx.name}.{gpx.stat().st_mtime_ns}.npy")
+        try:
+            return np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+
+        waypoints = GPSMockController._parse_gpx_xml(gpx)
+
+        try:
+            # Drop caches for older versions of the file, then write atomically
+            for stale in gpx.parent.glob(f"{glob.escape(gpx.name)}.*.npy"):
+                stale.unlink(missing_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, waypoints)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not cache parsed GPX: {e}")
 
-        waypoints = []
-
-        # Try with namespace
-        for trkpt in root.findall('.//gpx:trkpt', ns):
-            lat = float(trkpt.get('lat'))
-            lon = float(trkpt.get('lon'))
-            waypoints.append((lat, lon))
+        return waypoints
 
-        # Try without namespace if empty
-        if not waypoints:
-            for trkpt in root.findall('.//trkpt'):
-                lat = float(trkpt.get('lat'))
-                lon = float(trkpt.get('lon'))
-                waypoints.append((lat, lon))
+    @staticmethod
+    def _parse_gpx_xml(gpx_path: Path) -> np.ndarray:
+        """
+        Parse track points from the GPX XML.
 
-        return waypoints
+        Streams the file with iterparse (lxml's when installed, else the
+        stdlib one), so the full tree is never built. Track points are matched
+        by local name (any GPX namespace or none).
+        """
+        gpx_path = str(gpx_path)
+        coords = []  # interleaved lat, lon attribute strings - converted in one NumPy call
+
+        if lxml_etree is not None:
+            # The parser itself filters for trkpt - Python only sees matching elements
+            for _, elem in lxml_etree.iterparse(gpx_path, events=('end',), tag='{*}trkpt'):
+                coords.append(elem.get('lat'))
+                coords.append(elem.get('lon'))
+                elem.clear()
+                # Drop already-processed siblings too
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            return np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+        # Local-name match without splitting every tag: '{ns}trkpt' or bare 'trkpt'
+        for _, elem in ET.iterparse(gpx_path, events=('end',)):
+            tag = elem.tag
+            if tag.endswith('trkpt') and (len(tag) == 5 or tag[-6] == '}'):
+                coords.append(elem.get('lat'))
+                coords.append(elem.get('lon'))
+                elem.clear()
+            elif tag.endswith(('}trkseg', '}trk')) or tag in ('trkseg', 'trk'):
+                # Drop the (already cleared) points held by the parent
+                elem.clear()
+
+        return np.array(coords, dtype=np.float64).reshape(-1, 2)
 
 
 # Convenience functions for quick usage
 def set_gps_location(lat: float, lon: float, device_id: Optional[str] = None):
     """Quick function to set GPS location."""
-    gps = GPSMockController(device_id)
-    gps.start_service()
-    gps.set_location(lat, lon)
+    with GPSMockController(device_id) as gps:
+        gps.start_service()
+        gps.set_location(lat, lon)
 
 
 def play_gps_route(gpx_path: str, speed_kmh: float = 80.0, device_id: Optional[str] = None):
     """Quick function to play GPX route."""
-    gps = GPSMockController(device_id)
-    gps.start_service()
-    gps.play_gpx_route(gpx_path, speed_kmh)
+    with GPSMockController(device_id) as gps:
+        gps.start_service()
+        gps.play_gpx_route(gpx_path, speed_kmh)
+
+
+def simulate_routes(
+    routes: list[Tuple[GPSMockController, list[Tuple[float, float]]]],
+    speed_kmh: float = 80.0,
+    update_interval: float = 0.5
+):
+    """Drive several devices concurrently - one (controller, waypoints) pair per device."""
+    async def _drive_all():
+        await asyncio.gather(*(
+            controller.simulate_route_smooth_async(waypoints, speed_kmh, update_interval)
+            for controller, waypoints in routes
+        ))
+
+    asyncio.run(_drive_all())
 
 
 if __name__ == "__main__":
@@ -274,4 +673,5 @@ if __name__ == "__main__":
     print("Moving to Vienna...")
     controller.set_location(48.2082, 16.3738)
 
+    controller.close()
     print("Done!")
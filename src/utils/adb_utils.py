@@ -2,16 +2,154 @@
 ADB (Android Debug Bridge) utilities for device control.
 """
 import logging
+import queue
 import subprocess
 import shlex
-from typing import Optional, List, Tuple
+import threading
+import time
+import uuid
+from typing import Dict, Optional, List, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# adb is spawned a lot - keep subprocess calls free of preexec_fn, shell=True
+# and user/group changes so CPython can launch via vfork/posix_spawn instead
+# of a full fork of the (large) pytest + Appium client process.
+
+
+class AdbShell:
+    """
+    One long-lived `adb shell` that runs commands in turn.
+
+    Saves the adb process start and device connection of a separate
+    `adb shell ...` per command. Opened on first use; reopened if it died,
+    so closing it while others still hold it only costs them a reconnect.
+    """
+
+    # Default per-command deadline in seconds (as ADBUtils._execute)
+    TIMEOUT = 30.0
+
+    def __init__(self, device_id: Optional[str] = None):
+        self.device_id = device_id
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None  # output lines of _proc, None at EOF
+        self._lock = threading.Lock()
+        self._end = f"__ADB_END_{uuid.uuid4().hex}__"
+
+    def run(self, command: str, timeout: float = TIMEOUT) -> str:
+        """
+        Run a shell command and return its output (stdout and stderr).
+
+        Raises:
+            subprocess.TimeoutExpired: No sentinel within `timeout` seconds.
+                The shell is killed; the next call opens a new one.
+        """
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._open()
+
+            try:
+                # Newline first so the sentinel starts a line even after
+                # output that does not end in one
+                self._proc.stdin.write(f"{command}; printf '\\n{self._end}\\n'\n")
+                self._proc.stdin.flush()
+            except OSError:
+                self._close()
+                raise
+
+            deadline = time.monotonic() + timeout
+            lines = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    # Stalled command or half-dead connection - drop the shell,
+                    # its late output must not end up in the next command's
+                    self._kill()
+                    raise subprocess.TimeoutExpired(command, timeout, output="".join(lines))
+                if line is None:
+                    # Shell exited before the sentinel (device gone?)
+                    self._close()
+                    return "".join(lines)
+                if line.startswith(self._end):
+                    # Drop the newline printed ahead of the sentinel
+                    return "".join(lines)[:-1]
+                lines.append(line)
+
+    def close(self) -> None:
+        """Close the shell."""
+        with self._lock:
+            self._close()
+
+    def _open(self) -> None:
+        cmd = ["adb"]
+        if self.device_id:
+            cmd.extend(["-s", self.device_id])
+        cmd.append("shell")
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        # Read on a thread, so run() can wait for a line with a deadline
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self._proc, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, lines: queue.Queue) -> None:
+        """Reader thread - forward the shell's output lines, then None at EOF."""
+        with proc.stdout:
+            for line in iter(proc.stdout.readline, ""):
+                lines.put(line)
+        lines.put(None)
+
+    def _close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+    def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        proc.kill()
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        proc.wait()
+
+
+_shared_shells: Dict[Optional[str], AdbShell] = {}
+_shared_shells_lock = threading.Lock()
+
+
+def shared_shell(device_id: Optional[str] = None) -> AdbShell:
+    """
+    The AdbShell shared by all users of a device.
+
+    Memory sampling and recorder control then queue on one device
+    connection instead of each bursting over its own.
+    """
+    with _shared_shells_lock:
+        shell = _shared_shells.get(device_id)
+        if shell is None:
+            shell = _shared_shells[device_id] = AdbShell(device_id)
+        return shell
+
 
 class ADBUtils:
     """Utility class for ADB operations."""
 
+    # How long is_app_installed trusts its cached package list (seconds)
+    PACKAGES_TTL = 5.0
+
     def __init__(self, device_id: Optional[str] = None):
         """
         Initialize ADBUtils.
@@ -20,14 +158,13 @@ class ADBUtils:
             device_id: Specific device ID (for multiple connected devices)
         """
         self.device_id = device_id
+        self._argv_prefix = ('adb', '-s', device_id) if device_id else ('adb',)
+        self._packages: Optional[Set[str]] = None
+        self._packages_time = 0.0
 
     def _build_command(self, *args) -> List[str]:
         """Build ADB command with optional device targeting."""
-        cmd = ['adb']
-        if self.device_id:
-            cmd.extend(['-s', self.device_id])
-        cmd.extend(args)
-        return cmd
+        return [*self._argv_prefix, *args]
 
     def _execute(self, *args, timeout: int = 30) -> Tuple[str, str, int]:
         """
@@ -55,6 +192,34 @@ class ADBUtils:
             logger.error(f"Command timed out: {' '.join(cmd)}")
             return '', 'Command timed out', 1
 
+    def _execute_fire(self, *args, timeout: int = 30) -> int:
+        """
+        Execute ADB command without capturing its output.
+
+        For commands whose output nobody reads - skips piping and decoding it.
+
+        Returns:
+            Return code
+        """
+        cmd = self._build_command(*args)
+        logger.debug(f"Executing: {' '.join(cmd)}")
+
+        try:
+            return subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout
+            ).returncode
+        except subprocess.TimeoutExpired:
+            logger.error(f"Command timed out: {' '.join(cmd)}")
+            return 1
+
+    def shell_fire(self, command: str, timeout: int = 30) -> None:
+        """Execute shell command on device, discarding its output."""
+        if self._execute_fire('shell', command, timeout=timeout) != 0:
+            logger.warning(f"Shell command failed: {command}")
+
     def shell(self, command: str, timeout: int = 30) -> str:
         """
         Execute shell command on device.
@@ -73,13 +238,14 @@ class ADBUtils:
 
     def get_current_activity(self) -> str:
         """Get currently focused activity."""
-        output = self.shell('dumpsys activity activities | grep mResumedActivity')
-        # Parse activity name from output
-        if 'mResumedActivity' in output:
-            parts = output.split()
-            for part in parts:
-                if '/' in part:
-                    return part
+        # Scan here instead of piping through grep on the device
+        output = self.shell('dumpsys activity activities')
+        for line in output.splitlines():
+            if 'mResumedActivity' in line:
+                # Parse activity name from the line
+                for part in line.split():
+                    if '/' in part:
+                        return part
         return ''
 
     def get_device_info(self) -> dict:
@@ -161,26 +327,51 @@ class ADBUtils:
         Args:
             keycode: Android keycode (e.g., 4 for BACK)
         """
-        self.shell(f'input keyevent {keycode}')
+        self.shell_fire(f'input keyevent {keycode}')
 
     def tap(self, x: int, y: int) -> None:
         """Tap at coordinates."""
-        self.shell(f'input tap {x} {y}')
+        self.shell_fire(f'input tap {x} {y}')
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration_ms: int = 300) -> None:
         """Swipe gesture."""
-        self.shell(f'input swipe {x1} {y1} {x2} {y2} {duration_ms}')
+        self.shell_fire(f'input swipe {x1} {y1} {x2} {y2} {duration_ms}')
+
+    def screenshot(self, path: str, timeout: int = 30) -> bool:
+        """
+        Save a PNG screenshot of the device screen.
+
+        Streams `screencap -p` straight into the file - no WebDriver session,
+        base64 or HTTP framing involved.
+
+        Args:
+            path: Local file to write
+            timeout: Command timeout
+
+        Returns:
+            True if the screenshot was written
+        """
+        cmd = self._build_command('exec-out', 'screencap', '-p')
+        try:
+            with open(path, 'wb') as f:
+                code = subprocess.run(cmd, stdout=f, stderr=subprocess.DEVNULL, timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            logger.error(f"Command timed out: {' '.join(cmd)}")
+            return False
+        if code != 0:
+            logger.warning(f"Screenshot failed: {path}")
+        return code == 0
 
     def toggle_wifi(self, enable: bool) -> None:
         """Toggle WiFi on/off."""
         state = 'enable' if enable else 'disable'
-        self.shell(f'svc wifi {state}')
+        self.shell_fire(f'svc wifi {state}')
         logger.info(f"WiFi {'enabled' if enable else 'disabled'}")
 
     def toggle_mobile_data(self, enable: bool) -> None:
         """Toggle mobile data on/off."""
         state = 'enable' if enable else 'disable'
-        self.shell(f'svc data {state}')
+        self.shell_fire(f'svc data {state}')
         logger.info(f"Mobile data {'enabled' if enable else 'disabled'}")
 
     def toggle_airplane_mode(self, enable: bool) -> None:
@@ -201,9 +392,13 @@ class ADBUtils:
         logger.info(f"App force stopped: {package}")
 
     def is_app_installed(self, package: str) -> bool:
-        """Check if app is installed."""
-        output = self.shell(f'pm list packages | grep {package}')
-        return package in output
+        """Check if app is installed (package list cached for PACKAGES_TTL seconds)."""
+        now = time.monotonic()
+        if self._packages is None or now - self._packages_time > self.PACKAGES_TTL:
+            output = self.shell('pm list packages')
+            self._packages = {line.strip() for line in output.splitlines()}
+            self._packages_time = now
+        return f'package:{package}' in self._packages
 
     def get_connected_devices(self) -> List[str]:
         """Get list of connected device IDs."""
@@ -3,8 +3,12 @@ Driver Factory for creating Appium driver instances.
 Supports: Android Emulator, Real Device, BrowserStack
 """
 import os
+import copy
+import json
+import hashlib
 import logging
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, ClassVar, Tuple
 from pathlib import Path
 
 import yaml
@@ -15,6 +19,16 @@ from dotenv import load_dotenv
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# libyaml C loader when PyYAML was built with it - much faster than the pure-Python one
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a YAML file; cached per (path, mtime) so edits are still picked up."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
 
 class DriverFactory:
     """Factory class for creating and managing Appium drivers."""
@@ -25,22 +39,31 @@ class DriverFactory:
         'browserstack': 'browserstack.yaml'
     }
 
-    def __init__(self, config_dir: Optional[str] = None):
+    # Reusable sessions, keyed on hash of (server URL, capabilities)
+    _pool: ClassVar[Dict[str, webdriver.Remote]] = {}
+
+    def __init__(self, config_dir: Optional[str] = None, reuse_sessions: bool = False):
         """
         Initialize DriverFactory.
 
         Args:
             config_dir: Path to config directory. Defaults to project config/
+            reuse_sessions: Keep drivers alive between create_driver calls and hand
+                them out again for identical capabilities (see shutdown_pool).
         """
+        self.reuse_sessions = reuse_sessions
+        self._options_cache: Dict[str, Tuple[Dict[str, Any], UiAutomator2Options]] = {}
         if config_dir is None:
             config_dir = Path(__file__).parent.parent.parent / 'config'
         self.config_dir = Path(config_dir)
         self.main_config = self._load_yaml(self.config_dir / 'config.yaml')
 
-    def _load_yaml(self, path: Path) -> Dict[str, Any]:
-        """Load YAML configuration file."""
-        with open(path, 'r') as f:
-            return yaml.safe_load(f)
+    @staticmethod
+    def _load_yaml(path: Path) -> Dict[str, Any]:
+        """Load YAML configuration file (parsed once per file version)."""
+        parsed = _parse_yaml(str(path), os.stat(path).st_mtime_ns)
+        # Callers modify the result (env overrides, extra caps) - never hand out the cached one
+        return copy.deepcopy(parsed)
 
     def _get_capabilities(self, platform: str) -> Dict[str, Any]:
         """
@@ -64,6 +87,19 @@ class DriverFactory:
 
         return caps
 
+    def _base_options(self, platform: str) -> Tuple[Dict[str, Any], UiAutomator2Options]:
+        """
+        Capabilities and a loaded options object for a platform, built once per factory.
+
+        Treat both as read-only - create_driver copies them before adding extras.
+        """
+        if platform not in self._options_cache:
+            caps = self._get_capabilities(platform)
+            options = UiAutomator2Options()
+            options.load_capabilities(caps)
+            self._options_cache[platform] = (caps, options)
+        return self._options_cache[platform]
+
     def _apply_env_overrides(self, caps: Dict[str, Any], platform: str) -> Dict[str, Any]:
         """Apply environment variable overrides to capabilities."""
 
@@ -125,18 +161,29 @@ class DriverFactory:
 
         logger.info(f"Creating driver for platform: {platform}")
 
-        caps = self._get_capabilities(platform)
+        base_caps, base_options = self._base_options(platform)
 
         # Merge additional capabilities
+        caps = dict(base_caps)
         if additional_caps:
             caps.update(additional_caps)
 
-        # Create options object
-        options = UiAutomator2Options()
-        options.load_capabilities(caps)
-
         # Get server URL
         server_url = self._get_appium_url(platform)
+
+        if self.reuse_sessions:
+            key = hashlib.blake2b(
+                json.dumps({'url': server_url, 'caps': caps}, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            driver = self._reuse_pooled(key, caps)
+            if driver:
+                return driver
+
+        # Copy the prebuilt options object, only setting the per-call extras
+        options = copy.deepcopy(base_options)
+        for name, value in (additional_caps or {}).items():
+            options.set_capability(name, value)
+
         logger.info(f"Connecting to Appium server: {server_url}")
 
         # Create driver
@@ -151,11 +198,47 @@ class DriverFactory:
 
         logger.info(f"Driver created successfully. Session ID: {driver.session_id}")
 
+        if self.reuse_sessions:
+            self._pool[key] = driver
+
         return driver
 
-    @staticmethod
-    def quit_driver(driver: webdriver.Remote) -> None:
-        """Safely quit the driver."""
+    def _reuse_pooled(self, key: str, caps: Dict[str, Any]) -> Optional[webdriver.Remote]:
+        """Return the pooled driver for `key` with app state reset, or None if there is no live one."""
+        driver = self._pool.get(key)
+        if driver is None:
+            return None
+
+        try:
+            driver.current_package  # cheap round-trip - fails if the session is gone
+            package = caps.get('appPackage')
+            if package:
+                if caps.get('noReset'):
+                    # Keep app data (e.g. login) like a fresh noReset session would
+                    driver.terminate_app(package)
+                else:
+                    driver.execute_script('mobile: clearApp', {'appId': package})
+        except Exception as e:
+            logger.info(f"Pooled session unusable, creating a new one: {e}")
+            del self._pool[key]
+            return None
+
+        logger.info(f"Reusing pooled driver. Session ID: {driver.session_id}")
+        return driver
+
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """Quit all pooled drivers."""
+        while cls._pool:
+            _, driver = cls._pool.popitem()
+            cls.quit_driver(driver)
+
+    @classmethod
+    def quit_driver(cls, driver: webdriver.Remote) -> None:
+        """Safely quit the driver (pooled drivers stay alive until shutdown_pool)."""
+        if any(pooled is driver for pooled in cls._pool.values()):
+            return
+
         if driver:
             try:
                 driver.quit()
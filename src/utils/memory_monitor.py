@@ -3,23 +3,60 @@ Memory monitoring utilities for Android apps via ADB.
 
 Tracks memory usage over time, detects leaks, and generates reports.
 """
+import csv
+import functools
 import logging
 import re
+import shlex
+import socket
 import subprocess
 import threading
 import time
+from array import array
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Callable
 
-logger = logging.getLogger(__name__)
+import numpy as np
 
+from .adb_utils import shared_shell
 
-@dataclass
+try:
+    import re2  # optional (google-re2) - linear-time matching, no backtracking
+except ImportError:
+    re2 = None
+
+try:
+    import adbutils  # optional - talks to the adb server over its socket, no adb process per call
+except ImportError:
+    adbutils = None
+
+logger = logging.getLogger(__name__)
+
+# dumpsys meminfo App Summary labels -> field; the first number after the
+# colon is the PSS column. Example line: "           Java Heap:    23456      34567"
+_MEMINFO_LABELS = {
+    'TOTAL PSS': 'total_pss',
+    'Java Heap': 'java_heap',
+    'Native Heap': 'native_heap',
+    'Code': 'code',
+    'Stack': 'stack',
+    'Graphics': 'graphics',
+    'Private Other': 'private_other',
+    'System': 'system',
+}
+
+# Fallback: TOTAL line in table format, or the older (pre API 30) summary total
+# "  TOTAL   12345   12345   12345   12345   12345   12345"
+# "           TOTAL:   123456       TOTAL SWAP PSS:   0"
+_TOTAL_FALLBACK = re.compile(r'TOTAL:?\s+(\d+)')
+
+
+@dataclass(slots=True, frozen=True)
 class MemorySnapshot:
-    """Single memory measurement."""
-    timestamp: datetime
+    """Single memory measurement (immutable, no per-instance __dict__)."""
+    timestamp: int  # time.monotonic_ns() when sampled - see MemoryReport.wall_time
     total_pss_kb: int  # Proportional Set Size (most accurate for app memory)
     java_heap_kb: int
     native_heap_kb: int
@@ -49,55 +86,259 @@ class MemorySnapshot:
         )
 
 
+# MemorySnapshot integer fields, in constructor order
+_SNAPSHOT_FIELDS = ('total_pss_kb', 'java_heap_kb', 'native_heap_kb', 'code_kb',
+                    'stack_kb', 'graphics_kb', 'private_other_kb', 'system_kb')
+
+
+def _linreg_slope(x: np.ndarray, y: np.ndarray) -> float:
+    """Least-squares slope of y over x (0 for fewer than two distinct x values)."""
+    if len(x) < 2:
+        return 0.0
+    dx = x - x.mean()
+    denom = np.dot(dx, dx)
+    return float(np.dot(dx, y - y.mean()) / denom) if denom else 0.0
+
+
+# Columns written by MemoryReport.to_csv (read back by the report generator)
+CSV_HEADER = ('timestamp', 'total_pss_kb', 'java_heap_kb', 'native_heap_kb', 'code_kb', 'graphics_kb')
+
+
+def _wall_time(wall_start: datetime, start_ns: int, timestamp_ns: int) -> datetime:
+    """Wall-clock time of a time.monotonic_ns() reading, given one anchor pair."""
+    return wall_start + timedelta(microseconds=(timestamp_ns - start_ns) / 1000)
+
+
+def _adb_device(device_id: Optional[str]):
+    """adbutils device for device_id, or None to fall back to the adb binary."""
+    if adbutils is None:
+        return None
+    try:
+        device = adbutils.adb.device(serial=device_id)
+        device.get_state()  # fail here, not on the first sample, if it isn't reachable
+        return device
+    except Exception as e:  # no adb server, no/several devices, ...
+        logger.debug(f"adbutils unavailable, using adb subprocesses: {e}")
+        return None
+
+
+class SnapshotBuffer:
+    """
+    Columnar store of memory snapshots, optionally bounded.
+
+    Each field lives in its own array.array (timestamps as monotonic ns) -
+    a fraction of the size of a list of dataclass instances, and columns go
+    straight into NumPy. Indexing/iterating rebuilds MemorySnapshot objects on
+    demand, so it can be used like the list it replaces. Running PSS
+    min/max/sum make the report statistics O(1).
+
+    With maxlen > 0 it is a ring buffer: once full, each append overwrites
+    the oldest snapshot in place.
+
+    Appends come from one producer at a time. Unbounded, readers don't lock:
+    the count is published only after a snapshot's columns are written, so a
+    reader that takes count once and stays below it never sees a half-written
+    row. A full ring rewrites the oldest row in place, so whole-row or
+    multi-row reads (indexing, ordered(), copy()) must hold the producer's
+    lock; a single slot through first()/last() is always some complete value.
+    """
+
+    def __init__(self, snapshots=(), maxlen: int = 0):
+        self.maxlen = maxlen
+        self.timestamps = array('q')
+        self.columns = {name: array('i') for name in _SNAPSHOT_FIELDS}
+        self._head = 0  # physical index of the oldest snapshot once full
+        self._count = 0  # published snapshot count, written after the data
+        self.min_pss_kb = 0
+        self.max_pss_kb = 0
+        self.sum_pss_kb = 0
+        self.extend(snapshots)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        # Resolve against the published count - the columns may already hold
+        # a snapshot that is still being appended
+        count = self._count
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("snapshot index out of range")
+        if self._head:
+            index = (self._head + index) % count
+        return MemorySnapshot(
+            self.timestamps[index],
+            *(self.columns[name][index] for name in _SNAPSHOT_FIELDS)
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, snapshot: MemorySnapshot) -> None:
+        pss = snapshot.total_pss_kb
+
+        if self.maxlen and self._count >= self.maxlen:
+            # Full - overwrite the oldest slot
+            slot = self._head
+            evicted = self.columns['total_pss_kb'][slot]
+            for name in _SNAPSHOT_FIELDS:
+                self.columns[name][slot] = getattr(snapshot, name)
+            self.timestamps[slot] = snapshot.timestamp
+            self._head = (slot + 1) % self.maxlen
+
+            self.sum_pss_kb += pss - evicted
+            if evicted in (self.min_pss_kb, self.max_pss_kb):
+                # The extreme may have just left the window - rescan (in C)
+                pss_column = np.array(self.columns['total_pss_kb'], dtype=np.intc)
+                self.min_pss_kb, self.max_pss_kb = int(pss_column.min()), int(pss_column.max())
+            else:
+                self.min_pss_kb = min(self.min_pss_kb, pss)
+                self.max_pss_kb = max(self.max_pss_kb, pss)
+            return
+
+        if not self:
+            self.min_pss_kb = self.max_pss_kb = pss
+        elif pss < self.min_pss_kb:
+            self.min_pss_kb = pss
+        elif pss > self.max_pss_kb:
+            self.max_pss_kb = pss
+        self.sum_pss_kb += pss
+
+        for name in _SNAPSHOT_FIELDS:
+            self.columns[name].append(getattr(snapshot, name))
+        self.timestamps.append(snapshot.timestamp)
+        # Publish last - readers only see a snapshot once all its columns are in
+        self._count += 1
+
+    def extend(self, snapshots) -> None:
+        for snapshot in snapshots:
+            self.append(snapshot)
+
+    def ordered(self, name: str) -> array:
+        """One field ('timestamp' for monotonic ns), oldest first."""
+        values = self.timestamps if name == 'timestamp' else self.columns[name]
+        count, head = self._count, self._head
+        values = values[:count]
+        return values[head:] + values[:head] if head else values
+
+    def first(self, name: str):
+        """Oldest value of one field, or None if empty - reads a single column slot."""
+        count = self._count
+        if not count:
+            return None
+        values = self.timestamps if name == 'timestamp' else self.columns[name]
+        return values[self._head % count]
+
+    def last(self, name: str):
+        """Latest value of one field, or None if empty - reads a single column slot."""
+        count = self._count
+        if not count:
+            return None
+        values = self.timestamps if name == 'timestamp' else self.columns[name]
+        return values[(self._head + count - 1) % count]
+
+    def copy(self) -> "SnapshotBuffer":
+        new = SnapshotBuffer(maxlen=self.maxlen)
+        new.timestamps = array('q', self.ordered('timestamp'))
+        new.columns = {name: array('i', self.ordered(name)) for name in _SNAPSHOT_FIELDS}
+        new._count = len(new.timestamps)
+        new.min_pss_kb, new.max_pss_kb, new.sum_pss_kb = self.min_pss_kb, self.max_pss_kb, self.sum_pss_kb
+        return new
+
+    def column(self, name: str) -> np.ndarray:
+        """Copy of one field as a NumPy array, oldest first ('timestamp' for monotonic ns)."""
+        # np.array copies in one C call - unlike a frombuffer view, it doesn't
+        # keep a buffer export that would block the monitor thread's appends
+        dtype = np.int64 if name == 'timestamp' else np.intc
+        return np.array(self.ordered(name), dtype=dtype)
+
+
 @dataclass
 class MemoryReport:
     """Summary report of memory monitoring session."""
     package: str
     duration_seconds: float
-    snapshots: List[MemorySnapshot] = field(default_factory=list)
+    snapshots: SnapshotBuffer = field(default_factory=SnapshotBuffer)  # plain lists are converted
     events: List[Dict] = field(default_factory=list)  # Tagged events (recompute, etc.)
+    # Wall-clock anchor for the monotonic timestamps (defaults to "now")
+    wall_start: Optional[datetime] = None
+    start_ns: Optional[int] = None
+
+    def __post_init__(self):
+        if not isinstance(self.snapshots, SnapshotBuffer):
+            self.snapshots = SnapshotBuffer(self.snapshots)
+        if self.wall_start is None or self.start_ns is None:
+            self.wall_start, self.start_ns = datetime.now(), time.monotonic_ns()
+
+    def wall_time(self, timestamp_ns: int) -> datetime:
+        """Wall-clock time of a monotonic timestamp (snapshot.timestamp, event['timestamp_ns'])."""
+        return _wall_time(self.wall_start, self.start_ns, timestamp_ns)
 
     @property
     def min_pss_mb(self) -> float:
         if not self.snapshots:
             return 0
-        return min(s.total_pss_mb for s in self.snapshots)
+        return self.snapshots.min_pss_kb / 1024
 
     @property
     def max_pss_mb(self) -> float:
         if not self.snapshots:
             return 0
-        return max(s.total_pss_mb for s in self.snapshots)
+        return self.snapshots.max_pss_kb / 1024
 
     @property
     def avg_pss_mb(self) -> float:
         if not self.snapshots:
             return 0
-        return sum(s.total_pss_mb for s in self.snapshots) / len(self.snapshots)
+        return self.snapshots.sum_pss_kb / 1024 / len(self.snapshots)
 
     @property
     def memory_growth_mb(self) -> float:
         """Memory growth from first to last snapshot."""
         if len(self.snapshots) < 2:
             return 0
-        return self.snapshots[-1].total_pss_mb - self.snapshots[0].total_pss_mb
+        return (self.snapshots.last('total_pss_kb') - self.snapshots.first('total_pss_kb')) / 1024
 
     @property
     def memory_growth_percent(self) -> float:
         """Percentage memory growth."""
-        if len(self.snapshots) < 2 or self.snapshots[0].total_pss_mb == 0:
+        first_pss_kb = self.snapshots.first('total_pss_kb')
+        if len(self.snapshots) < 2 or not first_pss_kb:
             return 0
-        return (self.memory_growth_mb / self.snapshots[0].total_pss_mb) * 100
+        return (self.memory_growth_mb / (first_pss_kb / 1024)) * 100
+
+    @property
+    def pss_trend_mb_per_min(self) -> float:
+        """
+        PSS trend over the whole session (linear regression), MB per minute.
+
+        Unlike memory_growth_mb it isn't thrown off by a spike in the first or
+        last sample - a steady positive trend points to a leak.
+        """
+        timestamps_ns = self.snapshots.column('timestamp')
+        slope_kb_per_s = _linreg_slope(
+            (timestamps_ns - timestamps_ns[:1]) / 1e9,
+            self.snapshots.column('total_pss_kb').astype(np.float64)
+        )
+        return slope_kb_per_s * 60 / 1024
 
     def to_csv(self, path: Path) -> None:
         """Export snapshots to CSV."""
-        with open(path, 'w') as f:
-            f.write("timestamp,total_pss_kb,java_heap_kb,native_heap_kb,code_kb,graphics_kb\n")
-            for s in self.snapshots:
-                f.write(
-                    f"{s.timestamp.isoformat()},{s.total_pss_kb},{s.java_heap_kb},"
-                    f"{s.native_heap_kb},{s.code_kb},{s.graphics_kb}\n"
-                )
+        snapshots = self.snapshots
+        timestamps = (self.wall_time(ns).isoformat() for ns in snapshots.ordered('timestamp'))
+
+        with open(path, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(CSV_HEADER)
+            # Rows straight from the columns - no MemorySnapshot objects built
+            writer.writerows(zip(
+                timestamps, *(snapshots.ordered(name) for name in CSV_HEADER[1:])
+            ))
         logger.info(f"Memory report saved to: {path}")
 
     def summary(self) -> str:
@@ -114,13 +355,14 @@ class MemoryReport:
             f"  Max: {self.max_pss_mb:.1f} MB",
             f"  Avg: {self.avg_pss_mb:.1f} MB",
             f"  Growth: {self.memory_growth_mb:+.1f} MB ({self.memory_growth_percent:+.1f}%)",
+            f"  Trend: {self.pss_trend_mb_per_min:+.2f} MB/min",
             f"",
         ]
 
         if self.events:
             lines.append(f"Events: {len(self.events)}")
             for event in self.events[-10:]:  # Last 10 events
-                lines.append(f"  [{event['timestamp']}] {event['type']}: {event.get('details', '')}")
+                lines.append(f"  [{self.wall_time(event['timestamp_ns']).isoformat()}] {event['type']}: {event.get('details', '')}")
 
         lines.append("=" * 50)
         return "\n".join(lines)
@@ -140,25 +382,44 @@ class MemoryMonitor:
         print(report.summary())
     """
 
-    def __init__(self, package: str, device_id: Optional[str] = None):
+    def __init__(self, package: str, device_id: Optional[str] = None, max_snapshots: int = 0):
         """
         Initialize memory monitor.
 
         Args:
             package: Android package name to monitor
             device_id: ADB device ID (optional if only one device)
+            max_snapshots: Keep only the latest N snapshots (0 = unlimited)
         """
         self.package = package
         self.device_id = device_id
-        self._snapshots: List[MemorySnapshot] = []
+        self.max_snapshots = max_snapshots
+        self._snapshots = SnapshotBuffer(maxlen=max_snapshots)
+        self._append_lock = threading.Lock()  # serializes producers (and ring-mode copies)
         self._events: List[Dict] = []
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._start_time: Optional[datetime] = None
+        self._start_ns = 0
         self._on_snapshot: Optional[Callable[[MemorySnapshot], None]] = None
+        self._interval = 2.0  # seconds between samples, see set_interval()
+        self._latest_pss = 0.0  # MB, of the newest snapshot - see latest_pss_mb
+        # Sampling shares the device's persistent `adb shell` with the video
+        # recorder (opened lazily, closed in stop())
+        self._adb_shell = shared_shell(device_id)
+        self._device = _adb_device(device_id)
+
+    def _shell(self, command: str) -> str:
+        """Run a command in the device's shared adb shell and return its output."""
+        if self._device is not None:
+            return self._device.shell(command, timeout=10)
+        return self._adb_shell.run(command, timeout=10)
 
     def _adb_cmd(self, *args) -> str:
         """Execute ADB command."""
+        if self._device is not None and args and args[0] == "shell":
+            return self._device.shell(shlex.join(args[1:]), timeout=10)
+
         cmd = ["adb"]
         if self.device_id:
             cmd.extend(["-s", self.device_id])
@@ -175,7 +436,8 @@ class MemoryMonitor:
             MemorySnapshot or None if failed
         """
         try:
-            output = self._adb_cmd("shell", "dumpsys", "meminfo", self.package)
+            # -s: App Summary only - a fraction of the full per-mapping dump
+            output = self._shell(f"dumpsys meminfo -s {shlex.quote(self.package)}")
             return self._parse_meminfo(output)
         except Exception as e:
             logger.warning(f"Failed to get memory info: {e}")
@@ -186,34 +448,36 @@ class MemoryMonitor:
         if not output or "No process found" in output:
             return None
 
-        # Parse the summary table
-        # Example line: "  TOTAL PSS:   123456"
-        patterns = {
-            'total_pss': r'TOTAL\s+PSS:\s+(\d+)',
-            'total_rss': r'TOTAL\s+RSS:\s+(\d+)',
-            'java_heap': r'Java Heap:\s+(\d+)',
-            'native_heap': r'Native Heap:\s+(\d+)',
-            'code': r'Code:\s+(\d+)',
-            'stack': r'Stack:\s+(\d+)',
-            'graphics': r'Graphics:\s+(\d+)',
-            'private_other': r'Private Other:\s+(\d+)',
-            'system': r'System:\s+(\d+)',
-        }
-
-        values = {}
-        for key, pattern in patterns.items():
-            match = re.search(pattern, output)
-            values[key] = int(match.group(1)) if match else 0
-
-        # Fallback: try to parse from TOTAL line in table format
-        # "  TOTAL   12345   12345   12345   12345   12345   12345"
+        # Skip straight to the summary block (past the header, or the whole
+        # per-mapping table if -s was ignored)
+        start = output.find("App Summary")
+        summary = output[start:] if start >= 0 else output
+
+        # Line-prefix dispatch over the summary lines - no regex scan
+        values = dict.fromkeys(_MEMINFO_LABELS.values(), 0)
+        remaining = len(_MEMINFO_LABELS)
+        for line in summary.splitlines():
+            label, colon, rest = line.partition(':')
+            if not colon:
+                continue
+            key = _MEMINFO_LABELS.get(label.strip())
+            if key is None or values[key]:  # first occurrence wins
+                continue
+            numbers = rest.split(None, 1)
+            if numbers and numbers[0].isdigit():
+                values[key] = int(numbers[0])
+                remaining -= 1
+                if not remaining:
+                    break  # all fields seen - skip the rest of the output
+
+        # Fallback: try to parse from TOTAL line (table format / older summary)
         if values['total_pss'] == 0:
-            total_match = re.search(r'TOTAL\s+(\d+)', output)
+            total_match = _TOTAL_FALLBACK.search(output)
             if total_match:
                 values['total_pss'] = int(total_match.group(1))
 
         return MemorySnapshot(
-            timestamp=datetime.now(),
+            timestamp=time.monotonic_ns(),
             total_pss_kb=values['total_pss'],
             java_heap_kb=values['java_heap'],
             native_heap_kb=values['native_heap'],
@@ -229,7 +493,7 @@ class MemoryMonitor:
         Start continuous memory monitoring in background thread.
 
         Args:
-            interval_seconds: How often to sample memory
+            interval_seconds: How often to sample memory (see set_interval)
             on_snapshot: Optional callback for each snapshot
         """
         if self._running:
@@ -237,25 +501,49 @@ class MemoryMonitor:
             return
 
         self._running = True
+        self._interval = interval_seconds
+        # One wall-clock reading per session - samples only record monotonic_ns()
         self._start_time = datetime.now()
-        self._snapshots = []
+        self._start_ns = time.monotonic_ns()
+        self._snapshots = SnapshotBuffer(maxlen=self.max_snapshots)
+        self._latest_pss = 0.0
         self._events = []
         self._on_snapshot = on_snapshot
 
         def monitor_loop():
+            # Deadline scheduling - a slow adb call doesn't push every later sample back
+            next_t = time.monotonic()
             while self._running:
                 snapshot = self.get_memory_info()
                 if snapshot:
-                    self._snapshots.append(snapshot)
+                    with self._append_lock:
+                        self._snapshots.append(snapshot)
+                        self._latest_pss = snapshot.total_pss_mb
                     logger.debug(f"Memory: {snapshot}")
                     if self._on_snapshot:
                         self._on_snapshot(snapshot)
-                time.sleep(interval_seconds)
+
+                next_t += self._interval
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_t = time.monotonic()  # fell behind - don't fire a burst to catch up
 
         self._thread = threading.Thread(target=monitor_loop, daemon=True)
         self._thread.start()
         logger.info(f"Memory monitoring started for {self.package}")
 
+    def set_interval(self, interval_seconds: float) -> None:
+        """
+        Change the sampling interval of a running monitor.
+
+        Sample densely around bursts (app launch, route start) and sparsely in
+        steady state - each `dumpsys meminfo` costs the device real CPU. Takes
+        effect after the sample already scheduled.
+        """
+        self._interval = interval_seconds
+
     def stop(self) -> MemoryReport:
         """
         Stop monitoring and return report.
@@ -266,14 +554,21 @@ class MemoryMonitor:
         self._running = False
         if self._thread:
             self._thread.join(timeout=5)
+        self._adb_shell.close()
 
-        duration = (datetime.now() - self._start_time).total_seconds() if self._start_time else 0
+        duration = (time.monotonic_ns() - self._start_ns) / 1e9 if self._start_time else 0
+        # The sampler may outlive the join timeout and snapshot_now() can still
+        # append - a full ring rewrites rows in place, so copy under the lock
+        with self._append_lock:
+            snapshots = self._snapshots.copy()
 
         report = MemoryReport(
             package=self.package,
             duration_seconds=duration,
-            snapshots=self._snapshots.copy(),
+            snapshots=snapshots,
             events=self._events.copy(),
+            wall_start=self._start_time,
+            start_ns=self._start_ns if self._start_time else None,
         )
 
         logger.info(f"Memory monitoring stopped. Collected {len(self._snapshots)} samples.")
@@ -287,11 +582,12 @@ class MemoryMonitor:
             event_type: Type of event (e.g., "recompute", "memory_warning")
             details: Optional details
         """
+        last_pss_kb = self._snapshots.last('total_pss_kb')
         self._events.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": time.monotonic_ns(),  # formatted only when rendered
             "type": event_type,
             "details": details,
-            "memory_mb": self._snapshots[-1].total_pss_mb if self._snapshots else 0
+            "memory_mb": last_pss_kb / 1024 if last_pss_kb is not None else 0
         })
         logger.info(f"Event: {event_type} - {details}")
 
@@ -299,9 +595,65 @@ class MemoryMonitor:
         """Take immediate snapshot (useful for before/after comparisons)."""
         snapshot = self.get_memory_info()
         if snapshot:
-            self._snapshots.append(snapshot)
+            with self._append_lock:
+                self._snapshots.append(snapshot)
+                self._latest_pss = snapshot.total_pss_mb
         return snapshot
 
+    @property
+    def latest_pss_mb(self) -> float:
+        """Total PSS of the newest snapshot in MB (0.0 before the first one)."""
+        return self._latest_pss
+
+
+# Compiled logcat patterns are shared by every LogcatMonitor with the same
+# patterns. Our own cache - re's internal one is small and gets evicted by
+# unrelated re.* calls.
+@functools.lru_cache(maxsize=128)
+def _compile_ci(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_combined(patterns: tuple):
+    """All patterns in one case-insensitive alternation - RE2 when available."""
+    combined = "|".join(f"(?:{p})" for p in patterns)
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = False
+        options.log_errors = False
+        try:
+            return re2.compile(combined, options)
+        except Exception as e:  # e.g. backreferences / lookarounds - not supported by RE2
+            logger.debug(f"RE2 can't compile logcat patterns, using re: {e}")
+    return re.compile(combined, re.IGNORECASE)
+
+
+def _case_insensitive(pattern: str) -> str:
+    """
+    Rewrite a regex so letters match either case ("ab" -> "[aA][bB]").
+
+    For logcat's on-device --regex filter, which has no ignore-case flag.
+    Escapes and bracket expressions are left as they are - "[a-z]" stays
+    case-sensitive, so patterns with brackets are not filtered on the device.
+    """
+    out = []
+    in_class = escaped = False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif in_class:
+            in_class = ch != ']'
+        elif ch == '[':
+            in_class = True
+        elif ch.isalpha() and ch.lower() != ch.upper():
+            out.append(f"[{ch.lower()}{ch.upper()}]")
+            continue
+        out.append(ch)
+    return "".join(out)
+
 
 class LogcatMonitor:
     """
@@ -321,7 +673,8 @@ class LogcatMonitor:
         self,
         device_id: Optional[str] = None,
         patterns: Optional[List[str]] = None,
-        package_filter: Optional[str] = None
+        package_filter: Optional[str] = None,
+        device_filter: bool = False
     ):
         """
         Initialize logcat monitor.
@@ -330,15 +683,29 @@ class LogcatMonitor:
             device_id: ADB device ID
             patterns: Regex patterns to match (case-insensitive)
             package_filter: Filter logs by package (e.g., "com.roadlords")
+            device_filter: Let logcat drop non-matching lines on the device
+                (Android 7+). logcat applies --regex to the message text only,
+                so with this on a pattern that matches just the tag or the
+                `-v time` header never matches. Skipped for patterns the
+                case-insensitive rewrite can't express exactly (brackets,
+                inline flags, named groups).
         """
         self.device_id = device_id
         self.patterns = patterns or ["recompute", "recalculate", "reroute", "route.*calc"]
         self.package_filter = package_filter
+        self.device_filter = device_filter
+        self._compiled_patterns = tuple(_compile_ci(p) for p in self.patterns)
+        # All patterns in one alternation - most lines match nothing and are rejected in one scan
+        self._combined = _compile_combined(tuple(self.patterns))
         self._matches: List[Dict] = []
         self._running = False
         self._process: Optional[subprocess.Popen] = None
+        self._stream = None  # adbutils logcat connection, when adbutils is used
         self._thread: Optional[threading.Thread] = None
         self._on_match: Optional[Callable[[Dict], None]] = None
+        self._wall_start: Optional[datetime] = None
+        self._start_ns = 0
+        self._device = _adb_device(device_id)
 
     def start(self, on_match: Optional[Callable[[Dict], None]] = None) -> None:
         """
@@ -353,59 +720,100 @@ class LogcatMonitor:
         self._running = True
         self._matches = []
         self._on_match = on_match
-
-        # Clear logcat first
-        cmd = ["adb"]
-        if self.device_id:
-            cmd.extend(["-s", self.device_id])
-        cmd.extend(["logcat", "-c"])
-        subprocess.run(cmd, capture_output=True)
-
-        # Start logcat process
-        cmd = ["adb"]
-        if self.device_id:
-            cmd.extend(["-s", self.device_id])
-        cmd.extend(["logcat", "-v", "time"])
-
-        self._process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1
-        )
+        self._wall_start, self._start_ns = datetime.now(), time.monotonic_ns()
+
+        logcat_args = ["logcat", "-v", "time"]
+        # Named groups / inline flags don't survive _case_insensitive and bracket
+        # expressions stay case-sensitive - those filter on the host only
+        exact_rewrite = all("(?" not in p.replace("(?:", "") and "[" not in p for p in self.patterns)
+        if self.device_filter and exact_rewrite and self._supports_logcat_regex():
+            # Device-side prefilter; patterns still run below to tell which one matched
+            combined = "|".join(f"(?:{_case_insensitive(p)})" for p in self.patterns)
+            logcat_args.extend(["--regex", combined])
+
+        if self._device is not None:
+            # Clear logcat first, then stream it over one adb server socket
+            self._device.shell("logcat -c", timeout=10)
+            self._stream = self._device.shell(shlex.join(logcat_args), stream=True)
+            lines = self._stream.conn.makefile("r", encoding="utf-8", errors="replace")
+        else:
+            # Clear logcat first
+            cmd = ["adb"]
+            if self.device_id:
+                cmd.extend(["-s", self.device_id])
+            cmd.extend(["logcat", "-c"])
+            subprocess.run(cmd, capture_output=True)
+
+            # Start logcat process
+            cmd = ["adb"]
+            if self.device_id:
+                cmd.extend(["-s", self.device_id])
+            cmd.extend(logcat_args)
+
+            self._process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1
+            )
+            lines = self._process.stdout
 
         def read_loop():
-            compiled_patterns = [re.compile(p, re.IGNORECASE) for p in self.patterns]
-
-            while self._running and self._process.poll() is None:
-                line = self._process.stdout.readline()
-                if not line:
-                    continue
-
-                # Optional package filter
-                if self.package_filter and self.package_filter not in line:
-                    continue
-
-                # Check patterns
-                for pattern in compiled_patterns:
-                    if pattern.search(line):
-                        match = {
-                            "timestamp": datetime.now().isoformat(),
-                            "pattern": pattern.pattern,
-                            "line": line.strip()[:200]  # Truncate long lines
-                        }
-                        self._matches.append(match)
-                        logger.info(f"Logcat match: {pattern.pattern}")
-
-                        if self._on_match:
-                            self._on_match(match)
+            compiled_patterns = self._compiled_patterns
+            combined = self._combined
+
+            try:
+                for line in lines:
+                    if not self._running:
                         break
 
+                    # Optional package filter
+                    if self.package_filter and self.package_filter not in line:
+                        continue
+
+                    if not combined.search(line):
+                        continue
+
+                    # Find which pattern matched (first in list order, as before)
+                    for pattern in compiled_patterns:
+                        if pattern.search(line):
+                            match = {
+                                "timestamp_ns": time.monotonic_ns(),  # see wall_time()
+                                "pattern": pattern.pattern,
+                                "line": line.strip()[:200]  # Truncate long lines
+                            }
+                            self._matches.append(match)
+                            logger.info(f"Logcat match: {pattern.pattern}")
+
+                            if self._on_match:
+                                self._on_match(match)
+                            break
+            except (OSError, ValueError):  # adbutils stream closed under us by stop()
+                pass
+
         self._thread = threading.Thread(target=read_loop, daemon=True)
         self._thread.start()
         logger.info("Logcat monitoring started")
 
+    def _supports_logcat_regex(self) -> bool:
+        """logcat -e/--regex exists since Android 7.0 (API 24)."""
+        if self._device is not None:
+            try:
+                return int(self._device.shell("getprop ro.build.version.sdk", timeout=10).strip()) >= 24
+            except Exception:  # ValueError, adbutils.AdbError, ...
+                return False
+
+        cmd = ["adb"]
+        if self.device_id:
+            cmd.extend(["-s", self.device_id])
+        cmd.extend(["shell", "getprop", "ro.build.version.sdk"])
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            return int(result.stdout.strip()) >= 24
+        except (ValueError, subprocess.TimeoutExpired):
+            return False
+
     def stop(self) -> List[Dict]:
         """
         Stop monitoring and return matches.
@@ -419,12 +827,25 @@ class LogcatMonitor:
             self._process.terminate()
             self._process.wait(timeout=5)
 
+        if self._stream is not None:
+            # shutdown() wakes the reader blocked on the socket; close() alone doesn't
+            try:
+                self._stream.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._stream.close()
+            self._stream = None
+
         if self._thread:
             self._thread.join(timeout=5)
 
         logger.info(f"Logcat monitoring stopped. Found {len(self._matches)} matches.")
         return self._matches.copy()
 
+    def wall_time(self, timestamp_ns: int) -> datetime:
+        """Wall-clock time of a match's timestamp_ns."""
+        return _wall_time(self._wall_start, self._start_ns, timestamp_ns)
+
     @property
     def match_count(self) -> int:
         """Get current number of matches."""
@@ -7,12 +7,50 @@ Generates visual HTML reports with:
 - Screenshots gallery
 - Pass/Fail verdict
 """
+import bisect
+import functools
+import gzip
+import itertools
 import json
+import os
+import shutil
 from pathlib import Path
+from string import Template
+from urllib.parse import quote
 from datetime import datetime
 from typing import List, Dict, Optional
-from dataclasses import dataclass
-import base64
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import pybase64 as base64  # optional - SIMD encoder, same API as the stdlib module
+except ImportError:
+    import base64
+
+
+@dataclass
+class MemorySamples:
+    """Memory samples as parallel columns (one list per field, no dict per sample)."""
+    timestamps: List[str] = field(default_factory=list)
+    pss_mb: List[float] = field(default_factory=list)
+    elapsed_s: List[int] = field(default_factory=list)
+
+    @classmethod
+    def from_dicts(cls, samples: List[Dict]) -> "MemorySamples":
+        """Build from the old [{timestamp, pss_mb, elapsed_s}, ...] form."""
+        return cls(
+            timestamps=[s.get('timestamp', '') for s in samples],
+            pss_mb=[s.get('pss_mb', 0) for s in samples],
+            elapsed_s=[s.get('elapsed_s', i) for i, s in enumerate(samples)],
+        )
+
+    def append(self, timestamp: str, pss_mb: float, elapsed_s: int) -> None:
+        self.timestamps.append(timestamp)
+        self.pss_mb.append(pss_mb)
+        self.elapsed_s.append(elapsed_s)
+
+    def __len__(self) -> int:
+        return len(self.pss_mb)
 
 
 @dataclass
@@ -28,7 +66,7 @@ class StressTestResult:
     peak_memory_mb: float
     memory_growth_mb: float
     memory_growth_percent: float
-    memory_samples: List[Dict]  # [{timestamp, pss_mb, elapsed_s}, ...]
+    memory_samples: MemorySamples  # a [{timestamp, pss_mb, elapsed_s}, ...] list is converted
 
     # Recompute metrics
     baseline_recomputes: int
@@ -50,116 +88,102 @@ class StressTestResult:
     passed: bool = True
     verdict_reason: str = ""
 
-
-def generate_ui_verification_html(ui_verifier) -> str:
-    """Generate HTML for UI verification screenshots comparison."""
-    if not ui_verifier:
-        return ""
-
-    # Checkpoint descriptions
-    checkpoint_info = {
-        "search_opened": {
-            "title": "Search Bar Opened",
-            "icon": "🔍",
-            "description": "Verifies that search input field is visible and accessible",
-            "what_tested": ["Search bar presence", "Text input field", "UI layout consistency"]
-        },
-        "search_results": {
-            "title": "Search Results Display",
-            "icon": "📋",
-            "description": "Validates search results layout and result items",
-            "what_tested": ["Results list visibility", "Distance labels", "Result items layout"]
-        },
-        "destination_selected": {
-            "title": "Destination Selected",
-            "icon": "📍",
-            "description": "Checks destination detail panel and action buttons",
-            "what_tested": ["'Get directions' button", "Destination info panel", "Address display"]
-        },
-        "navigation_started": {
-            "title": "Navigation Active",
-            "icon": "🧭",
-            "description": "Verifies navigation UI elements during active navigation",
-            "what_tested": ["Navigation instructions", "Distance to turn", "Speed indicator", "Navigation header"]
-        },
-        "arrived": {
-            "title": "Arrival Dialog",
-            "icon": "🎯",
-            "description": "Validates arrival confirmation dialog and buttons",
-            "what_tested": ["'You've reached destination' message", "'Close' button", "Feedback dialog"]
-        }
+    def __post_init__(self):
+        if not isinstance(self.memory_samples, MemorySamples):
+            self.memory_samples = MemorySamples.from_dicts(self.memory_samples)
+
+
+# The chart can't show more points than it has pixels - longer runs are downsampled
+CHART_MAX_POINTS = 500
+
+
+def _downsample(xs: list, ys: list, target: int = CHART_MAX_POINTS):
+    """Bucket-mean downsampling: target equal buckets -> (first x, mean y) each."""
+    n = len(ys)
+    if n <= target:
+        return xs, ys
+    out_x, out_y = [], []
+    for i in range(target):
+        start, end = i * n // target, (i + 1) * n // target
+        out_x.append(xs[start])
+        out_y.append(sum(ys[start:end]) / (end - start))
+    return out_x, out_y
+
+
+def _b64_file(path: Path) -> str:
+    """File contents as base64 text, for data: URIs."""
+    # Keyed on the real path and mtime - a baseline that is also the current
+    # screenshot is encoded once. Cleared after each report, so the MB-sized
+    # strings don't outlive it
+    st = os.stat(path)
+    return _b64_cached(os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _b64_cached(path: str, mtime_ns: int, size: int) -> str:
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode('ascii')
+
+
+# Screenshots are read and encoded on a few threads - file reads release the
+# GIL, so one image's read overlaps another's encode. Threads start on first use.
+_encode_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="report-b64")
+
+
+def _resolve_parts(parts: list) -> List[str]:
+    """Replace the pending _b64_file futures in an HTML chunk list with their text."""
+    return [part.result() if isinstance(part, Future) else part for part in parts]
+
+
+# UI verification checkpoint descriptions
+CHECKPOINT_INFO = {
+    "search_opened": {
+        "title": "Search Bar Opened",
+        "icon": "🔍",
+        "description": "Verifies that search input field is visible and accessible",
+        "what_tested": ["Search bar presence", "Text input field", "UI layout consistency"]
+    },
+    "search_results": {
+        "title": "Search Results Display",
+        "icon": "📋",
+        "description": "Validates search results layout and result items",
+        "what_tested": ["Results list visibility", "Distance labels", "Result items layout"]
+    },
+    "destination_selected": {
+        "title": "Destination Selected",
+        "icon": "📍",
+        "description": "Checks destination detail panel and action buttons",
+        "what_tested": ["'Get directions' button", "Destination info panel", "Address display"]
+    },
+    "navigation_started": {
+        "title": "Navigation Active",
+        "icon": "🧭",
+        "description": "Verifies navigation UI elements during active navigation",
+        "what_tested": ["Navigation instructions", "Distance to turn", "Speed indicator", "Navigation header"]
+    },
+    "arrived": {
+        "title": "Arrival Dialog",
+        "icon": "🎯",
+        "description": "Validates arrival confirmation dialog and buttons",
+        "what_tested": ["'You've reached destination' message", "'Close' button", "Feedback dialog"]
     }
+}
 
-    html = ""
-    checkpoints = ["search_opened", "search_results", "destination_selected", "navigation_started", "arrived"]
-
-    for checkpoint in checkpoints:
-        if checkpoint not in ui_verifier.current_screenshots:
-            continue
-
-        current_screenshot = ui_verifier.current_screenshots[checkpoint]
-        if not current_screenshot or not current_screenshot.exists():
-            continue
 
-        # Find baseline screenshot
-        baseline_screenshot = None
-        for pattern in [f"{checkpoint}_*.png", f"{checkpoint}.png"]:
-            matches = list(ui_verifier.baseline_dir.glob(pattern))
-            if matches:
-                baseline_screenshot = matches[0]
-                break
-
-        if not baseline_screenshot or not baseline_screenshot.exists():
-            continue
-
-        # Read and encode screenshots as base64
-        with open(baseline_screenshot, 'rb') as f:
-            baseline_img_data = base64.b64encode(f.read()).decode('utf-8')
-
-        with open(current_screenshot, 'rb') as f:
-            current_img_data = base64.b64encode(f.read()).decode('utf-8')
-
-        # Get checkpoint info
-        info = checkpoint_info.get(checkpoint, {
-            "title": checkpoint.replace('_', ' ').title(),
-            "icon": "📱",
-            "description": "UI verification checkpoint",
-            "what_tested": []
-        })
-
-        # Get verification results for this checkpoint
-        verification_status = "✅ PASS"
-        verification_details = []
-        if ui_verifier.verification_results:
-            checkpoint_results = [r for r in ui_verifier.verification_results if r.checkpoint == checkpoint]
-            failed_checks = [r for r in checkpoint_results if not r.passed]
-
-            if failed_checks:
-                verification_status = f"❌ FAIL ({len(failed_checks)} issues)"
-                for check in failed_checks:
-                    verification_details.append(f"• {check.element_name}: {check.details}")
-            else:
-                passed_count = len(checkpoint_results)
-                if passed_count > 0:
-                    verification_status = f"✅ PASS ({passed_count}/{passed_count} checks)"
-
-        verification_html = ""
-        if verification_details:
-            verification_html = f'''
+# Per-checkpoint HTML (str.format_map templates). The baseline and current
+# base64 payloads go between the three pieces as chunks of their own.
+_CHECKPOINT_ISSUES_TPL = '''
             <div style="background: rgba(255,0,0,0.1); padding: 10px; border-radius: 4px; margin-top: 10px;">
                 <strong style="color: #ff6b6b;">Issues Found:</strong><br>
-                {'<br>'.join(verification_details)}
+                {details}
             </div>
             '''
 
-        # Build what's tested list
-        tested_items_html = "".join([f"<li>{item}</li>" for item in info['what_tested']])
-
-        html += f'''
+_CHECKPOINT_HEAD_TPL = '''
         <div class="ui-checkpoint" style="margin-bottom: 40px; padding: 25px; background: rgba(255,255,255,0.05); border-radius: 8px; border-left: 4px solid #4CAF50;">
             <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 15px;">
                 <h4 style="color: #fff; margin: 0; font-size: 1.3em;">
-                    {info['icon']} {info['title']}
+                    {icon} {title}
                 </h4>
                 <span style="background: rgba(76,175,80,0.2); color: #4CAF50; padding: 5px 15px; border-radius: 20px; font-size: 0.9em; font-weight: bold;">
                     {verification_status}
@@ -167,7 +191,7 @@ def generate_ui_verification_html(ui_verifier) -> str:
             </div>
 
             <p style="color: #bbb; margin-bottom: 15px; font-size: 0.95em;">
-                {info['description']}
+                {description}
             </p>
 
             <div style="background: rgba(0,0,0,0.2); padding: 12px; border-radius: 5px; margin-bottom: 15px;">
@@ -185,12 +209,15 @@ def generate_ui_verification_html(ui_verifier) -> str:
                         <strong style="color: #64B5F6; font-size: 0.9em;">📸 Baseline (Expected)</strong>
                     </div>
                     <div style="background: rgba(0,0,0,0.3); padding: 10px; border-radius: 0 0 5px 5px;">
-                        <img src="data:image/png;base64,{baseline_img_data}"
+                        <img src="data:image/png;base64,'''
+
+_CHECKPOINT_MID_TPL = '''"
                              id="baseline_{checkpoint}"
                              style="max-width: 100%; height: auto; border: 2px solid #555; border-radius: 4px; cursor: pointer; transition: transform 0.2s;"
                              onclick="openImageInNewTab('baseline_{checkpoint}')"
                              onmouseover="this.style.transform='scale(1.02)'"
                              onmouseout="this.style.transform='scale(1)'"
+                             loading="lazy" decoding="async"
                              alt="Baseline"
                              title="Click to open in new tab">
                         <p style="color: #888; font-size: 0.85em; margin-top: 8px;">Click to enlarge</p>
@@ -201,12 +228,15 @@ def generate_ui_verification_html(ui_verifier) -> str:
                         <strong style="color: #AED581; font-size: 0.9em;">📸 Current Run (Actual)</strong>
                     </div>
                     <div style="background: rgba(0,0,0,0.3); padding: 10px; border-radius: 0 0 5px 5px;">
-                        <img src="data:image/png;base64,{current_img_data}"
+                        <img src="data:image/png;base64,'''
+
+_CHECKPOINT_TAIL_TPL = '''"
                              id="current_{checkpoint}"
                              style="max-width: 100%; height: auto; border: 2px solid #555; border-radius: 4px; cursor: pointer; transition: transform 0.2s;"
                              onclick="openImageInNewTab('current_{checkpoint}')"
                              onmouseover="this.style.transform='scale(1.02)'"
                              onmouseout="this.style.transform='scale(1)'"
+                             loading="lazy" decoding="async"
                              alt="Current"
                              title="Click to open in new tab">
                         <p style="color: #888; font-size: 0.85em; margin-top: 8px;">Click to enlarge</p>
@@ -216,66 +246,184 @@ def generate_ui_verification_html(ui_verifier) -> str:
         </div>
         '''
 
+
+def _ui_verification_parts(ui_verifier) -> List[str]:
+    """HTML chunks for the UI verification screenshots comparison."""
+    if not ui_verifier:
+        return []
+
+    # Checkpoint screenshots are written in the background - read them only
+    # once they are complete on disk
+    ui_verifier.wait_for_writes()
+
+    # Chunks joined once at the end - `html +=` would recopy the whole
+    # (base64-heavy) document on every checkpoint
+    parts = []
+    checkpoints = ["search_opened", "search_results", "destination_selected", "navigation_started", "arrived"]
+
+    # Map checkpoints to baseline screenshots with one directory scan
+    # ("<checkpoint>_*.png" preferred over "<checkpoint>.png", as the globs did)
+    prefixed_baselines = {}
+    exact_baselines = {}
+    try:
+        with os.scandir(ui_verifier.baseline_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith('.png'):
+                    continue
+                for checkpoint in checkpoints:
+                    if name == f"{checkpoint}.png":
+                        exact_baselines.setdefault(checkpoint, Path(entry.path))
+                    elif name.startswith(f"{checkpoint}_"):
+                        prefixed_baselines.setdefault(checkpoint, Path(entry.path))
+    except OSError:  # no baseline directory yet
+        pass
+
+    for checkpoint in checkpoints:
+        if checkpoint not in ui_verifier.current_screenshots:
+            continue
+
+        current_screenshot = ui_verifier.current_screenshots[checkpoint]
+        if not current_screenshot or not current_screenshot.exists():
+            continue
+
+        # Find baseline screenshot
+        baseline_screenshot = prefixed_baselines.get(checkpoint) or exact_baselines.get(checkpoint)
+
+        if not baseline_screenshot or not baseline_screenshot.exists():
+            continue
+
+        # Get checkpoint info
+        info = CHECKPOINT_INFO.get(checkpoint, {
+            "title": checkpoint.replace('_', ' ').title(),
+            "icon": "📱",
+            "description": "UI verification checkpoint",
+            "what_tested": []
+        })
+
+        # Get verification results for this checkpoint
+        verification_status = "✅ PASS"
+        verification_details = []
+        if ui_verifier.verification_results:
+            checkpoint_results = [r for r in ui_verifier.verification_results if r.checkpoint == checkpoint]
+            failed_checks = [r for r in checkpoint_results if not r.passed]
+
+            if failed_checks:
+                verification_status = f"❌ FAIL ({len(failed_checks)} issues)"
+                for check in failed_checks:
+                    verification_details.append(f"• {check.element_name}: {check.details}")
+            else:
+                passed_count = len(checkpoint_results)
+                if passed_count > 0:
+                    verification_status = f"✅ PASS ({passed_count}/{passed_count} checks)"
+
+        fields = {
+            "checkpoint": checkpoint,
+            "icon": info['icon'],
+            "title": info['title'],
+            "description": info['description'],
+            "verification_status": verification_status,
+            # Build what's tested list
+            "tested_items_html": "".join(f"<li>{item}</li>" for item in info['what_tested']),
+            "verification_html": _CHECKPOINT_ISSUES_TPL.format(details='<br>'.join(verification_details))
+                                 if verification_details else "",
+        }
+
+        parts.append(_CHECKPOINT_HEAD_TPL.format_map(fields))
+        # Base64 payloads are list entries of their own - never copied into a bigger string
+        parts.append(_encode_pool.submit(_b64_file, baseline_screenshot))
+        parts.append(_CHECKPOINT_MID_TPL.format_map(fields))
+        parts.append(_encode_pool.submit(_b64_file, current_screenshot))
+        parts.append(_CHECKPOINT_TAIL_TPL.format_map(fields))
+
+    return _resolve_parts(parts)
+
+
+def _gallery_item(screenshot: Path) -> List[str]:
+    """HTML chunks for one fallback-gallery screenshot ([] if the file is gone)."""
+    try:
+        # Embed as base64 for portability
+        img_data = _b64_file(screenshot)
+    except FileNotFoundError:  # instead of an exists() stat before every read
+        return []
+    return ['''
+                <div class="screenshot">
+                    <img src="data:image/png;base64,''', img_data, f'''" loading="lazy" decoding="async" alt="{screenshot.name}">
+                    <p>{screenshot.name}</p>
+                </div>
+                ''']
+
+
+def generate_ui_verification_html(ui_verifier) -> str:
+    """Generate HTML for UI verification screenshots comparison."""
+    html = "".join(_ui_verification_parts(ui_verifier))
+    _b64_cached.cache_clear()
     return html
 
 
-def generate_html_report(result: StressTestResult, output_path: Path, ui_verifier=None) -> Path:
-    """Generate a comprehensive HTML report."""
+# Page template (string.Template - CSS/JS braces need no escaping). Split at
+# $screenshots so the screenshot chunks can be written between the halves.
+_REPORT_HEAD, _, _REPORT_TAIL = (
+    Path(__file__).with_name("report_template.html").read_text(encoding="utf-8").partition("$screenshots")
+)
+_REPORT_HEAD, _REPORT_TAIL = Template(_REPORT_HEAD), Template(_REPORT_TAIL)
 
-    # Prepare memory chart data with time in seconds
-    memory_labels = []
-    memory_values = []
-    for i, sample in enumerate(result.memory_samples):
-        # Use elapsed_s if available, otherwise calculate from sample index
-        elapsed = sample.get('elapsed_s', i)
-        memory_labels.append(elapsed)
-        memory_values.append(sample.get('pss_mb', 0))
+
+def generate_html_report(
+    result: StressTestResult,
+    output_path: Path,
+    ui_verifier=None,
+    compress: bool = False
+) -> Path:
+    """
+    Generate a comprehensive HTML report.
+
+    With compress=True the page is written gzipped to <name>.html.gz (for
+    serving over HTTP with Content-Encoding: gzip) and that path is returned.
+    """
+
+    # Prepare memory chart data with time in seconds (the CSV keeps every sample)
+    memory_labels, memory_values = _downsample(result.memory_samples.elapsed_s, result.memory_samples.pss_mb)
+    # Baseline marker: first chart point at or after the end of the baseline
+    # phase (labels are sorted elapsed seconds - samples aren't assumed evenly spaced)
+    baseline_index = bisect.bisect_left(memory_labels, result.baseline_duration_s)
 
     # Prepare video HTML
     video_html = ""
     if result.video_path and result.video_path.exists():
-        # Embed video with base64 for portability (if small enough) or link
+        # Reference the MP4 next to the report instead of embedding it as base64 -
+        # the browser streams and seeks it, and nothing is read or encoded here
         video_size_mb = result.video_path.stat().st_size / (1024 * 1024)
-        if video_size_mb < 100:  # Embed if < 100MB
-            with open(result.video_path, 'rb') as f:
-                video_data = base64.b64encode(f.read()).decode('utf-8')
-            video_html = f'''
+        report_dir = output_path.parent.resolve()
+        try:
+            video_rel = result.video_path.resolve().relative_to(report_dir)
+        except ValueError:  # outside the report directory - copy it alongside
+            video_rel = Path(result.video_path.name)
+            shutil.copyfile(result.video_path, report_dir / video_rel)
+        video_src = quote(video_rel.as_posix())
+        video_html = f'''
             <div class="video-container">
                 <h3 class="section-title">🎬 Test Recording</h3>
-                <p class="video-info">Scroll the video to correlate with memory chart timestamps. Baseline ends at {result.baseline_duration_s}s.</p>
-                <video controls width="100%">
-                    <source src="data:video/mp4;base64,{video_data}" type="video/mp4">
+                <p class="video-info">Scroll the video to correlate with memory chart timestamps. Baseline ends at {result.baseline_duration_s}s. <a href="{video_src}">{video_rel.name}</a> ({video_size_mb:.1f} MB)</p>
+                <video controls width="100%" preload="metadata">
+                    <source src="{video_src}" type="video/mp4">
                     Your browser does not support video playback.
                 </video>
             </div>
             '''
-        else:
-            video_html = f'''
-            <div class="video-container">
-                <h3 class="section-title">🎬 Test Recording</h3>
-                <p class="video-info">Video file: <a href="file://{result.video_path}">{result.video_path.name}</a> ({video_size_mb:.1f} MB)</p>
-            </div>
-            '''
 
-    # Prepare screenshots HTML
-    screenshots_html = ""
+    # Prepare screenshots HTML - kept as chunks all the way to the file
+    screenshot_parts = []
 
     # Use UI verification if available
     if ui_verifier:
-        screenshots_html = generate_ui_verification_html(ui_verifier)
+        screenshot_parts = _ui_verification_parts(ui_verifier)
     else:
-        # Fallback to regular screenshots
-        for screenshot in result.screenshots[-12:]:  # Last 12 screenshots
-            if screenshot.exists():
-                # Embed as base64 for portability
-                with open(screenshot, 'rb') as f:
-                    img_data = base64.b64encode(f.read()).decode('utf-8')
-                screenshots_html += f'''
-                <div class="screenshot">
-                    <img src="data:image/png;base64,{img_data}" alt="{screenshot.name}">
-                    <p>{screenshot.name}</p>
-                </div>
-                '''
+        # Fallback to regular screenshots (last 12)
+        items = [_encode_pool.submit(_gallery_item, screenshot) for screenshot in result.screenshots[-12:]]
+        screenshot_parts = [part for item in items for part in item.result()]
+    if not any(screenshot_parts):
+        screenshot_parts = ['<p class="no-events">No screenshots available</p>']
 
     # Determine status colors
     if result.passed:
@@ -291,352 +439,48 @@ def generate_html_report(result: StressTestResult, output_path: Path, ui_verifie
         status_icon = "⚠️"
         status_text = "WARNING"
 
-    # Calculate baseline marker position (percentage of total samples)
-    total_samples = len(result.memory_samples)
-    baseline_samples = int(result.baseline_duration_s / (result.baseline_duration_s + result.deviation_duration_s) * total_samples) if total_samples > 0 else 0
-
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Stress Test Report - {result.test_name}</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
-            background: #1a1a2e;
-            color: #eee;
-            padding: 20px;
-            line-height: 1.6;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        h1 {{
-            text-align: center;
-            margin-bottom: 10px;
-            color: #fff;
-        }}
-        .subtitle {{
-            text-align: center;
-            color: #888;
-            margin-bottom: 30px;
-        }}
-        .status-banner {{
-            text-align: center;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 30px;
-            font-size: 24px;
-            font-weight: bold;
-        }}
-        .status-banner.pass {{
-            background: linear-gradient(135deg, #1b4332, #2d6a4f);
-            border: 2px solid #40916c;
-        }}
-        .status-banner.fail {{
-            background: linear-gradient(135deg, #641220, #85182a);
-            border: 2px solid #a4161a;
-        }}
-        .status-banner.warning {{
-            background: linear-gradient(135deg, #7f4f24, #936639);
-            border: 2px solid #b08968;
-        }}
-        .cards {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .card {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 20px;
-            border: 1px solid #0f3460;
-        }}
-        .card h3 {{
-            color: #e94560;
-            margin-bottom: 15px;
-            font-size: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-        .metric {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 10px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid #0f3460;
-        }}
-        .metric:last-child {{
-            border-bottom: none;
-            margin-bottom: 0;
-            padding-bottom: 0;
-        }}
-        .metric-label {{
-            color: #888;
-        }}
-        .metric-value {{
-            font-weight: bold;
-            color: #fff;
-        }}
-        .metric-value.positive {{
-            color: #40916c;
-        }}
-        .metric-value.negative {{
-            color: #e94560;
-        }}
-        .chart-container {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 30px;
-            border: 1px solid #0f3460;
-        }}
-        .chart-title {{
-            color: #e94560;
-            margin-bottom: 15px;
-            font-size: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-        .screenshots-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 15px;
-            margin-top: 20px;
-        }}
-        .screenshot {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 10px;
-            border: 1px solid #0f3460;
-        }}
-        .screenshot img {{
-            width: 100%;
-            border-radius: 5px;
-        }}
-        .screenshot p {{
-            text-align: center;
-            margin-top: 8px;
-            font-size: 12px;
-            color: #888;
-        }}
-        .section-title {{
-            color: #e94560;
-            margin: 30px 0 15px 0;
-            font-size: 14px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-        .events-list {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 20px;
-            border: 1px solid #0f3460;
-            max-height: 300px;
-            overflow-y: auto;
-        }}
-        .event-item {{
-            padding: 10px;
-            margin-bottom: 10px;
-            background: #0f3460;
-            border-radius: 5px;
-            font-family: monospace;
-            font-size: 12px;
-        }}
-        .no-events {{
-            color: #888;
-            text-align: center;
-            padding: 20px;
-        }}
-        .video-container {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 30px;
-            border: 1px solid #0f3460;
-        }}
-        .video-container video {{
-            border-radius: 8px;
-            margin-top: 10px;
-        }}
-        .video-info {{
-            color: #888;
-            font-size: 14px;
-            margin-bottom: 10px;
-        }}
-        footer {{
-            text-align: center;
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #0f3460;
-            color: #666;
-            font-size: 12px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🚛 Roadlords Stress Test Report</h1>
-        <p class="subtitle">{result.test_name} | {result.start_time.strftime('%Y-%m-%d %H:%M:%S')}</p>
-
-        <div class="status-banner {status_class}">
-            {status_icon} {status_text}: {result.verdict_reason}
-        </div>
-
-        <div class="cards">
-            <div class="card">
-                <h3>📊 Memory Summary</h3>
-                <div class="metric">
-                    <span class="metric-label">Initial</span>
-                    <span class="metric-value">{result.initial_memory_mb:.1f} MB</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Final</span>
-                    <span class="metric-value">{result.final_memory_mb:.1f} MB</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Peak</span>
-                    <span class="metric-value">{result.peak_memory_mb:.1f} MB</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Growth</span>
-                    <span class="metric-value {'negative' if result.memory_growth_percent > 15 else 'positive'}">{result.memory_growth_mb:+.1f} MB ({result.memory_growth_percent:+.1f}%)</span>
-                </div>
-            </div>
-
-            <div class="card">
-                <h3>⏱️ Test Duration</h3>
-                <div class="metric">
-                    <span class="metric-label">Total Navigation</span>
-                    <span class="metric-value">{result.duration_seconds:.0f}s</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Memory Samples</span>
-                    <span class="metric-value">{len(result.memory_samples)}</span>
-                </div>
-            </div>
-        </div>
-
-        <div class="chart-container">
-            <h3 class="chart-title">Memory Usage Over Time</h3>
-            <p style="color: #888; font-size: 12px; margin-bottom: 10px;">📊 Memory usage during navigation - correlate with video timestamp</p>
-            <canvas id="memoryChart"></canvas>
-        </div>
-
-        {video_html}
-
-        <h3 class="section-title">📸 UI Verification - Screenshots Comparison</h3>
-        <div class="screenshots-grid">
-            {screenshots_html if screenshots_html else '<p class="no-events">No screenshots available</p>'}
-        </div>
+    # Chart data goes in a sibling script rather than inline in the page. A
+    # <script src> works from file:// where fetch() of a .json file would not.
+    chart_data_path = output_path.with_suffix('.chart.js')
+    with open(chart_data_path, 'w') as f:
+        f.write("const memoryChartData = ")
+        json.dump({"labels": memory_labels, "values": memory_values}, f, separators=(',', ':'))
+        f.write(";\n")
+
+    # Values for the report template placeholders
+    fields = {
+        "test_name": result.test_name,
+        "start_time": result.start_time.strftime('%Y-%m-%d %H:%M:%S'),
+        "status_class": status_class,
+        "status_icon": status_icon,
+        "status_text": status_text,
+        "verdict_reason": result.verdict_reason,
+        "initial_memory_mb": f"{result.initial_memory_mb:.1f}",
+        "final_memory_mb": f"{result.final_memory_mb:.1f}",
+        "peak_memory_mb": f"{result.peak_memory_mb:.1f}",
+        "growth_class": 'negative' if result.memory_growth_percent > 15 else 'positive',
+        "memory_growth_mb": f"{result.memory_growth_mb:+.1f}",
+        "memory_growth_percent": f"{result.memory_growth_percent:+.1f}",
+        "duration_s": f"{result.duration_seconds:.0f}",
+        "sample_count": len(result.memory_samples),
+        "video_html": video_html,
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "chart_data_src": quote(chart_data_path.name),
+        "baseline_duration_s": result.baseline_duration_s,
+        "baseline_index": baseline_index,
+    }
 
-        <footer>
-            Generated by Roadlords Automation Framework | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        </footer>
-    </div>
-
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-annotation@2.2.1/dist/chartjs-plugin-annotation.min.js"></script>
-    <script>
-        const ctx = document.getElementById('memoryChart').getContext('2d');
-        const baselineEndSeconds = {result.baseline_duration_s};
-
-        new Chart(ctx, {{
-            type: 'line',
-            data: {{
-                labels: {json.dumps(memory_labels)},
-                datasets: [{{
-                    label: 'Memory (MB)',
-                    data: {json.dumps(memory_values)},
-                    borderColor: '#e94560',
-                    backgroundColor: 'rgba(233, 69, 96, 0.1)',
-                    fill: true,
-                    tension: 0.3,
-                    pointRadius: 0,
-                    borderWidth: 2
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: true,
-                aspectRatio: 2.5,
-                interaction: {{
-                    intersect: false,
-                    mode: 'index'
-                }},
-                plugins: {{
-                    legend: {{
-                        display: false
-                    }},
-                    tooltip: {{
-                        callbacks: {{
-                            title: function(context) {{
-                                return 'Time: ' + context[0].label + 's';
-                            }},
-                            label: function(context) {{
-                                return 'Memory: ' + context.parsed.y.toFixed(1) + ' MB';
-                            }}
-                        }}
-                    }},
-                    annotation: {{
-                        annotations: {{}}
-                    }}
-                }},
-                scales: {{
-                    x: {{
-                        title: {{
-                            display: true,
-                            text: 'Time (seconds) - correlate with video',
-                            color: '#888'
-                        }},
-                        grid: {{
-                            color: '#0f3460'
-                        }},
-                        ticks: {{
-                            color: '#888',
-                            callback: function(value) {{
-                                return value + 's';
-                            }}
-                        }}
-                    }},
-                    y: {{
-                        title: {{
-                            display: true,
-                            text: 'Memory (MB)',
-                            color: '#888'
-                        }},
-                        grid: {{
-                            color: '#0f3460'
-                        }},
-                        ticks: {{
-                            color: '#888'
-                        }}
-                    }}
-                }}
-            }}
-        }});
-
-        // Function to open image in new tab
-        function openImageInNewTab(imgId) {{
-            const img = document.getElementById(imgId);
-            const newWindow = window.open('', '_blank');
-            newWindow.document.write('<html><head><title>Screenshot</title><style>body{{margin:0;background:#000;display:flex;justify-content:center;align-items:center;min-height:100vh;}}img{{max-width:100%;height:auto;}}</style></head><body><img src="' + img.src + '"></body></html>');
-            newWindow.document.close();
-        }}
-    </script>
-</body>
-</html>
-'''
-
-    output_path.write_text(html)
+    # Written chunk by chunk - the multi-MB page is never assembled (or encoded) in one piece
+    if compress:
+        output_path = output_path.with_suffix('.html.gz')
+        out = gzip.open(output_path, 'wt', encoding='utf-8', compresslevel=6)
+    else:
+        out = open(output_path, 'w', encoding='utf-8')
+    with out as f:
+        f.write(_REPORT_HEAD.substitute(fields))
+        f.writelines(screenshot_parts)
+        f.write(_REPORT_TAIL.substitute(fields))
+    _b64_cached.cache_clear()
     return output_path
 
 
@@ -654,45 +498,62 @@ def generate_report_from_test_data(
     deviation_duration: int,
     output_dir: Path,
     video_path: Optional[Path] = None,
-    ui_verifier=None
+    ui_verifier=None,
+    compress: bool = False
 ) -> Path:
     """Generate report from test data files."""
 
     # Load memory samples from CSV
-    memory_samples = []
+    memory_samples = MemorySamples()
     first_timestamp = None
     if memory_csv_path.exists():
         import csv
         from datetime import datetime as dt
-        with open(memory_csv_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+        with open(memory_csv_path, 'r', newline='') as f:
+            # Positional reader - only two columns are needed, no dict per row
+            reader = csv.reader(f)
+            header = next(reader, [])
+            pss_idx = header.index('total_pss_kb') if 'total_pss_kb' in header else None
+            ts_idx = header.index('timestamp') if 'timestamp' in header else None
+            # All timestamps in a file come from the same to_csv - once one doesn't
+            # parse, stop trying and fall back to sample indices
+            parse_timestamps = ts_idx is not None
+            rows = (row for row in reader if row)  # skip blank lines (DictReader did too)
+
+            # Elapsed time is relative to the first sample - take it up front so
+            # the loop below needn't check for it on every row
+            first_row = next(rows, None)
+            if first_row is not None and parse_timestamps:
+                try:
+                    first_timestamp = dt.fromisoformat(first_row[ts_idx])
+                except ValueError:
+                    parse_timestamps = False
+
+            for row in itertools.chain((first_row,) if first_row is not None else (), rows):
                 # CSV has total_pss_kb, convert to MB
-                pss_kb = float(row.get('total_pss_kb', 0))
-                timestamp_str = row.get('timestamp', '')
+                pss_kb = float(row[pss_idx]) if pss_idx is not None else 0.0
+                timestamp_str = row[ts_idx] if ts_idx is not None else ''
 
                 # Calculate elapsed seconds from first sample
                 elapsed_s = len(memory_samples)  # Default to sample index
-                if timestamp_str:
+                if parse_timestamps:
                     try:
-                        ts = dt.fromisoformat(timestamp_str)
-                        if first_timestamp is None:
-                            first_timestamp = ts
-                        elapsed_s = (ts - first_timestamp).total_seconds()
-                    except:
-                        pass
-
-                memory_samples.append({
-                    'timestamp': timestamp_str,
-                    'pss_mb': pss_kb / 1024,  # Convert KB to MB
-                    'elapsed_s': int(elapsed_s)
-                })
+                        elapsed_s = (dt.fromisoformat(timestamp_str) - first_timestamp).total_seconds()
+                    except ValueError:
+                        parse_timestamps = False
+
+                memory_samples.append(timestamp_str, pss_kb / 1024, int(elapsed_s))  # KB -> MB
 
     # Get screenshots
-    screenshots = sorted(screenshots_dir.glob('*.png')) if screenshots_dir.exists() else []
+    screenshots = []
+    if screenshots_dir.exists():
+        # One scandir, sorted on names - no glob pattern matching or Path comparisons
+        with os.scandir(screenshots_dir) as entries:
+            names = sorted(entry.name for entry in entries if entry.name.endswith('.png'))
+        screenshots = [screenshots_dir / name for name in names]
 
     # Calculate metrics
-    final_memory = memory_samples[-1]['pss_mb'] if memory_samples else initial_memory
+    final_memory = memory_samples.pss_mb[-1] if memory_samples else initial_memory
     memory_growth = final_memory - initial_memory
     memory_growth_pct = (memory_growth / initial_memory * 100) if initial_memory > 0 else 0
 
@@ -733,4 +594,4 @@ def generate_report_from_test_data(
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_path = output_dir / f"stress_report_{timestamp}.html"
 
-    return generate_html_report(result, output_path, ui_verifier)
+    return generate_html_report(result, output_path, ui_verifier, compress=compress)
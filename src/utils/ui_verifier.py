@@ -3,20 +3,140 @@ UI Verification - Visual regression testing for UI elements.
 
 Captures baseline UI state and compares subsequent test runs against it.
 """
+import base64
+import functools
+import hashlib
 import json
 import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from PIL import Image
 import numpy as np
-from skimage.metrics import structural_similarity as ssim
+from scipy.ndimage import uniform_filter
+
+try:
+    import orjson  # optional - faster baseline.json, dataclasses serialized natively
+except ImportError:
+    orjson = None
+
+try:
+    import cv2  # optional - decodes PNGs straight to grayscale
+except ImportError:
+    cv2 = None
 
 logger = logging.getLogger(__name__)
 
+# SSIM parameters - same defaults as skimage.metrics.structural_similarity
+# for 8-bit grayscale input
+SSIM_WIN_SIZE = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
 
-@dataclass
+
+def _ssim_means(pairs: List[Tuple[np.ndarray, np.ndarray]]) -> List[float]:
+    """
+    Mean SSIM of each pair of float32 grayscale images.
+
+    The two images of a pair must have equal shape, at least 7x7. All
+    pairs are stacked into one buffer holding the five local statistics
+    (means, second moments, cross moment), which is box-filtered in place
+    in a single call. Each pair is then scored only over its interior,
+    where the window never reaches a neighbouring image, so the result is
+    the same as scoring the pairs one by one. Per-pixel maps are never kept.
+    """
+    if not pairs:
+        return []
+
+    win = SSIM_WIN_SIZE
+    pad = (win - 1) // 2
+    height = sum(arr1.shape[0] for arr1, _ in pairs)
+    width = max(arr1.shape[1] for arr1, _ in pairs)
+
+    # Zeroed, not empty - the filter runs over the unused right-hand margin
+    # of narrower images too, and garbage there could be inf/nan
+    stats = np.zeros((5, height, width), dtype=np.float32)
+    spans = []
+    top = 0
+    for arr1, arr2 in pairs:
+        h, w = arr1.shape
+        rows = slice(top, top + h)
+        stats[0, rows, :w] = arr1
+        stats[1, rows, :w] = arr2
+        np.multiply(arr1, arr1, out=stats[2, rows, :w])
+        np.multiply(arr2, arr2, out=stats[3, rows, :w])
+        np.multiply(arr1, arr2, out=stats[4, rows, :w])
+        spans.append((slice(top + pad, top + h - pad), slice(pad, w - pad)))
+        top += h
+    uniform_filter(stats, size=(1, win, win), output=stats)
+
+    cov_norm = win * win / (win * win - 1)
+    scores = []
+    for rows, cols in spans:
+        ux, uy, uxx, uyy, uxy = stats[:, rows, cols]
+
+        # Turn second moments into variances/covariance in place. Sample
+        # (unbiased) covariance, as skimage does by default
+        uxx -= ux * ux
+        uyy -= uy * uy
+        uxy -= ux * uy
+
+        num = (2 * ux * uy + SSIM_C1) * (2 * cov_norm * uxy + SSIM_C2)
+        den = (ux * ux + uy * uy + SSIM_C1) * (cov_norm * (uxx + uyy) + SSIM_C2)
+        scores.append(float((num / den).mean()))
+    return scores
+
+
+def _load_gray(path: Path) -> np.ndarray:
+    """Image as a read-only float32 grayscale array."""
+    # Keyed on the real path and mtime, so a rewritten region file is
+    # decoded again but an unchanged baseline is decoded once per process
+    st = os.stat(path)
+    return _load_gray_cached(os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_gray_cached(path: str, mtime_ns: int, size: int) -> np.ndarray:
+    gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE) if cv2 is not None else None
+    if gray is not None:
+        arr = gray.astype(np.float32)
+    else:
+        # No OpenCV, or a file it can't read - PIL raises a proper error
+        with Image.open(path) as img:
+            gray = img.convert('L')
+        # 8-bit raw bytes of known shape - one copy, no __array_interface__
+        width, height = gray.size
+        arr = np.frombuffer(gray.tobytes(), dtype=np.uint8).reshape(height, width).astype(np.float32)
+    arr.setflags(write=False)  # shared between callers
+    return arr
+
+
+def _file_digest(path: Path) -> bytes:
+    """blake2b digest of the file contents."""
+    st = os.stat(path)
+    return _file_digest_cached(os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=128)
+def _file_digest_cached(path: str, mtime_ns: int, size: int) -> bytes:
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
+# Region crops are PNG-encoded on background threads - zlib releases the
+# GIL, so encoding overlaps with the next Appium call. Threads start on first use.
+_write_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ui-region-png")
+
+# Region crops are read back for SSIM and shown in reports, never shipped -
+# fast deflate is worth the ~30% larger files
+REGION_PNG_COMPRESS_LEVEL = 1
+
+
+@dataclass(slots=True)
 class UIElement:
     """Represents a captured UI element."""
     name: str
@@ -30,7 +150,7 @@ class UIElement:
     checkpoint: str  # e.g., "search_opened", "navigation_started"
 
 
-@dataclass
+@dataclass(slots=True)
 class UIRegion:
     """Represents a cropped region of the screen for visual comparison."""
     name: str
@@ -39,7 +159,7 @@ class UIRegion:
     screenshot_path: str
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationResult:
     """Result of comparing a UI element or region."""
     checkpoint: str
@@ -81,6 +201,12 @@ class UIVerifier:
         self.baseline_dir.mkdir(parents=True, exist_ok=True)
         self.mode = mode
 
+        # Regions cropped in verify mode go here, so they don't overwrite
+        # the baseline regions they are compared against
+        self.current_dir = self.baseline_dir / "current"
+        if mode == "verify":
+            self.current_dir.mkdir(exist_ok=True)
+
         # Current capture data (used in both modes)
         self.current_elements: Dict[str, List[UIElement]] = {}  # checkpoint -> elements
         self.current_regions: Dict[str, List[UIRegion]] = {}  # checkpoint -> regions
@@ -90,9 +216,22 @@ class UIVerifier:
         self.baseline_elements: Dict[str, List[UIElement]] = {}
         self.baseline_regions: Dict[str, List[UIRegion]] = {}
 
+        # Baseline lookups by name, built once (checkpoint -> name -> item)
+        self._baseline_element_maps: Dict[str, Dict[str, UIElement]] = {}
+        self._baseline_region_maps: Dict[str, Dict[str, UIRegion]] = {}
+
         # Verification results
         self.verification_results: List[VerificationResult] = []
 
+        # Screenshots and region crops still being written by _write_pool
+        self._pending_writes: List[Future] = []
+        self._screenshot_writes: Dict[Path, Future] = {}  # screenshot path -> its write
+
+        # Screenshots decoded for cropping, shared by all regions of a
+        # checkpoint (screenshot path -> pixels). Dropped once writes finish
+        self._decoded_screenshots: Dict[Path, np.ndarray] = {}
+        self._decode_lock = threading.Lock()
+
         if mode == "verify":
             self._load_baseline()
 
@@ -105,8 +244,11 @@ class UIVerifier:
                 f"Run test in 'capture' mode first to create baseline."
             )
 
-        with open(baseline_file, 'r') as f:
-            data = json.load(f)
+        if orjson is not None:
+            data = orjson.loads(baseline_file.read_bytes())
+        else:
+            with open(baseline_file, 'r') as f:
+                data = json.load(f)
 
         # Load elements
         for checkpoint, elements_data in data.get('elements', {}).items():
@@ -120,6 +262,15 @@ class UIVerifier:
                 UIRegion(**region_data) for region_data in regions_data
             ]
 
+        self._baseline_element_maps = {
+            checkpoint: {elem.name: elem for elem in elems}
+            for checkpoint, elems in self.baseline_elements.items()
+        }
+        self._baseline_region_maps = {
+            checkpoint: {region.name: region for region in regions}
+            for checkpoint, regions in self.baseline_regions.items()
+        }
+
         logger.info(f"Loaded baseline with {len(self.baseline_elements)} checkpoints")
 
     def capture_checkpoint(self, driver, checkpoint: str, screenshot_name: Optional[str] = None):
@@ -136,7 +287,12 @@ class UIVerifier:
         screenshot_name = screenshot_name or f"{checkpoint}_{timestamp}"
         screenshot_path = self.baseline_dir / f"{screenshot_name}.png"
 
-        driver.save_screenshot(str(screenshot_path))
+        # Only the transfer has to happen now, while the screen shows the
+        # checkpoint - decoding and writing the PNG is left to _write_pool
+        png_b64 = driver.get_screenshot_as_base64()
+        write = _write_pool.submit(self._write_screenshot, screenshot_path, png_b64)
+        self._screenshot_writes[screenshot_path] = write
+        self._pending_writes.append(write)
         self.current_screenshots[checkpoint] = screenshot_path
 
         # Initialize checkpoint in dictionaries
@@ -209,47 +365,92 @@ class UIVerifier:
 
         self.current_regions[checkpoint].append(region)
 
-        # Crop and save region image
-        region_path = self.baseline_dir / f"{checkpoint}_{name}_region.png"
-        self._crop_and_save_region(screenshot_path, region.bounds, region_path)
+        # Crop and save region image (in the background)
+        region_dir = self.current_dir if self.mode == "verify" else self.baseline_dir
+        region_path = region_dir / f"{checkpoint}_{name}_region.png"
+        self._pending_writes.append(
+            _write_pool.submit(self._crop_and_save_region, screenshot_path, region.bounds, region_path)
+        )
 
         logger.debug(f"Added region '{name}' to checkpoint '{checkpoint}'")
 
     def _crop_and_save_region(self, screenshot_path: Path, bounds: Dict, output_path: Path):
         """Crop a region from screenshot and save it."""
         try:
-            img = Image.open(screenshot_path)
-            cropped = img.crop((
-                bounds['x'],
-                bounds['y'],
-                bounds['x'] + bounds['width'],
-                bounds['y'] + bounds['height']
-            ))
-            cropped.save(output_path)
+            pixels = self._decoded_screenshot(screenshot_path)
+            x, y = bounds['x'], bounds['y']
+            x2, y2 = x + bounds['width'], y + bounds['height']
+
+            if x >= 0 and y >= 0 and x2 <= pixels.shape[1] and y2 <= pixels.shape[0]:
+                # Slice of the decoded screenshot - no new zero-filled buffer
+                cropped = Image.fromarray(pixels[y:y2, x:x2])
+            else:
+                # Bounds run off the screenshot: let PIL pad with black as before
+                cropped = Image.fromarray(pixels).crop((x, y, x2, y2))
+            cropped.save(output_path, compress_level=REGION_PNG_COMPRESS_LEVEL)
         except Exception as e:
             logger.warning(f"Failed to crop region: {e}")
 
+    @staticmethod
+    def _write_screenshot(screenshot_path: Path, png_b64: str):
+        """Decode a base64 screenshot from Appium and write it as PNG."""
+        try:
+            screenshot_path.write_bytes(base64.b64decode(png_b64))
+        except Exception as e:
+            logger.warning(f"Failed to save screenshot {screenshot_path}: {e}")
+
+    def _decoded_screenshot(self, screenshot_path: Path) -> np.ndarray:
+        """Screenshot pixels decoded once, however many regions are cropped from it."""
+        # The screenshot write was submitted before any crop of it, so it is
+        # already running on another worker - waiting here can't deadlock
+        write = self._screenshot_writes.get(screenshot_path)
+        if write is not None:
+            write.result()
+        with self._decode_lock:
+            pixels = self._decoded_screenshots.get(screenshot_path)
+            if pixels is None:
+                with Image.open(screenshot_path) as img:
+                    if img.mode not in ("L", "RGB", "RGBA"):
+                        img = img.convert("RGBA")
+                    pixels = np.asarray(img)
+                self._decoded_screenshots[screenshot_path] = pixels
+            return pixels
+
+    def wait_for_writes(self):
+        """
+        Block until all screenshots and region crops submitted so far are on disk.
+
+        Call before reading the files behind current_screenshots or the
+        region crops from outside (e.g. report generation).
+        """
+        for future in self._pending_writes:
+            future.result()
+        self._pending_writes.clear()
+        self._screenshot_writes.clear()
+        self._decoded_screenshots.clear()
+
     def save_baseline(self):
         """Save captured baseline data to disk (call after all checkpoints captured)."""
         if self.mode != "capture":
             logger.warning("save_baseline() called but mode is not 'capture'")
             return
 
+        self.wait_for_writes()
+
+        # The element/region dataclasses are serialized as they are - natively
+        # by orjson, or through asdict() as json's fallback
         baseline_data = {
             'captured_at': datetime.now().isoformat(),
-            'elements': {
-                checkpoint: [asdict(elem) for elem in elems]
-                for checkpoint, elems in self.current_elements.items()
-            },
-            'regions': {
-                checkpoint: [asdict(region) for region in regions]
-                for checkpoint, regions in self.current_regions.items()
-            }
+            'elements': self.current_elements,
+            'regions': self.current_regions
         }
 
         baseline_file = self.baseline_dir / "baseline.json"
-        with open(baseline_file, 'w') as f:
-            json.dump(baseline_data, f, indent=2)
+        if orjson is not None:
+            baseline_file.write_bytes(orjson.dumps(baseline_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(baseline_file, 'w') as f:
+                json.dump(baseline_data, f, indent=2, default=asdict)
 
         logger.info(f"Baseline saved: {baseline_file}")
         logger.info(f"  Checkpoints: {len(self.current_elements)}")
@@ -270,16 +471,19 @@ class UIVerifier:
             logger.warning("verify_checkpoint() called but mode is not 'verify'")
             return []
 
+        # Current region crops must be written before they are compared
+        self.wait_for_writes()
+
         results = []
 
         # Verify elements
-        baseline_elems = self.baseline_elements.get(checkpoint, [])
+        baseline_elems = self._baseline_element_maps.get(checkpoint, {})
         current_elems = self.current_elements.get(checkpoint, [])
 
         results.extend(self._verify_elements(checkpoint, baseline_elems, current_elems))
 
         # Verify regions (visual comparison)
-        baseline_regions = self.baseline_regions.get(checkpoint, [])
+        baseline_regions = self._baseline_region_maps.get(checkpoint, {})
         current_regions = self.current_regions.get(checkpoint, [])
 
         results.extend(self._verify_regions(checkpoint, baseline_regions, current_regions))
@@ -287,13 +491,12 @@ class UIVerifier:
         self.verification_results.extend(results)
         return results
 
-    def _verify_elements(self, checkpoint: str, baseline: List[UIElement],
+    def _verify_elements(self, checkpoint: str, baseline_map: Dict[str, UIElement],
                         current: List[UIElement]) -> List[VerificationResult]:
-        """Compare UI elements between baseline and current."""
+        """Compare UI elements between baseline (by name) and current."""
         results = []
 
         # Create lookup by name
-        baseline_map = {elem.name: elem for elem in baseline}
         current_map = {elem.name: elem for elem in current}
 
         # Check all baseline elements exist and match
@@ -312,8 +515,9 @@ class UIVerifier:
                 continue
 
             # Compare properties
+            failures = []
             if baseline_elem.text != current_elem.text:
-                results.append(VerificationResult(
+                failures.append(VerificationResult(
                     checkpoint=checkpoint,
                     element_name=f"{name}.text",
                     passed=False,
@@ -323,7 +527,7 @@ class UIVerifier:
                 ))
 
             if baseline_elem.visible != current_elem.visible:
-                results.append(VerificationResult(
+                failures.append(VerificationResult(
                     checkpoint=checkpoint,
                     element_name=f"{name}.visible",
                     passed=False,
@@ -332,8 +536,10 @@ class UIVerifier:
                     actual_value=current_elem.visible
                 ))
 
+            results.extend(failures)
+
             # If all checks passed
-            if not any(r.element_name.startswith(name) for r in results if not r.passed):
+            if not failures:
                 results.append(VerificationResult(
                     checkpoint=checkpoint,
                     element_name=name,
@@ -343,14 +549,21 @@ class UIVerifier:
 
         return results
 
-    def _verify_regions(self, checkpoint: str, baseline: List[UIRegion],
+    def _verify_regions(self, checkpoint: str, baseline_map: Dict[str, UIRegion],
                        current: List[UIRegion]) -> List[VerificationResult]:
-        """Compare visual regions using SSIM."""
+        """Compare visual regions (baseline by name) using SSIM."""
         results = []
 
-        baseline_map = {region.name: region for region in baseline}
         current_map = {region.name: region for region in current}
 
+        # Threshold for pass/fail (95% similarity)
+        threshold = 0.95
+
+        # Load every region first, then score all that need it in one batch.
+        # Their results are filled in afterwards, in baseline order
+        pending: Dict[str, int] = {}  # region name -> index in results
+        pairs: List[Tuple[np.ndarray, np.ndarray]] = []
+
         for name, baseline_region in baseline_map.items():
             current_region = current_map.get(name)
 
@@ -365,23 +578,10 @@ class UIVerifier:
 
             # Compare images using SSIM
             baseline_img_path = self.baseline_dir / f"{checkpoint}_{name}_region.png"
-            current_img_path = self.baseline_dir / f"{checkpoint}_{name}_region.png"
+            current_img_path = self.current_dir / f"{checkpoint}_{name}_region.png"
 
             try:
-                similarity = self._compare_images(baseline_img_path, current_img_path)
-
-                # Threshold for pass/fail (95% similarity)
-                threshold = 0.95
-                passed = similarity >= threshold
-
-                results.append(VerificationResult(
-                    checkpoint=checkpoint,
-                    element_name=f"region_{name}",
-                    passed=passed,
-                    details=f"Visual similarity: {similarity:.2%}",
-                    similarity_score=similarity
-                ))
-
+                pair = self._load_pair(baseline_img_path, current_img_path)
             except Exception as e:
                 results.append(VerificationResult(
                     checkpoint=checkpoint,
@@ -389,28 +589,74 @@ class UIVerifier:
                     passed=False,
                     details=f"Failed to compare images: {e}"
                 ))
+                continue
+
+            if pair is None:
+                results.append(self._region_result(checkpoint, name, 1.0, threshold))
+            else:
+                pending[name] = len(results)
+                results.append(None)
+                pairs.append(pair)
+
+        if pairs:
+            scores = _ssim_means(pairs)
+            for (name, index), similarity in zip(pending.items(), scores):
+                results[index] = self._region_result(checkpoint, name, similarity, threshold)
 
         return results
 
+    def _region_result(self, checkpoint: str, name: str, similarity: float,
+                       threshold: float) -> VerificationResult:
+        """Verification result for a region compared at `similarity`."""
+        return VerificationResult(
+            checkpoint=checkpoint,
+            element_name=f"region_{name}",
+            passed=similarity >= threshold,
+            details=f"Visual similarity: {similarity:.2%}",
+            similarity_score=similarity
+        )
+
     def _compare_images(self, img1_path: Path, img2_path: Path) -> float:
         """
         Compare two images using Structural Similarity Index (SSIM).
 
+        Byte-identical files score 1.0 without being decoded.
+
         Returns:
             Similarity score (0-1, where 1 is identical)
         """
-        img1 = Image.open(img1_path).convert('L')  # Convert to grayscale
-        img2 = Image.open(img2_path).convert('L')
+        pair = self._load_pair(img1_path, img2_path)
+        if pair is None:
+            return 1.0
+        return _ssim_means([pair])[0]
 
-        # Resize if needed
-        if img1.size != img2.size:
-            img2 = img2.resize(img1.size)
+    def _load_pair(self, img1_path: Path,
+                   img2_path: Path) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Load two images as grayscale arrays of the first one's size.
+
+        Returns None if the files are byte-identical (nothing to compare).
+        """
+        # Unchanged region - byte-identical files need no decode
+        if os.path.samefile(img1_path, img2_path) or _file_digest(img1_path) == _file_digest(img2_path):
+            return None
 
-        arr1 = np.array(img1)
-        arr2 = np.array(img2)
+        arr1 = _load_gray(img1_path)
+        arr2 = _load_gray(img2_path)
 
-        similarity, _ = ssim(arr1, arr2, full=True)
-        return similarity
+        win = SSIM_WIN_SIZE
+        if min(arr1.shape) < win:
+            raise ValueError(f"Image {arr1.shape[1]}x{arr1.shape[0]} is smaller than the {win}x{win} SSIM window")
+
+        # Resize if needed
+        if arr1.shape != arr2.shape:
+            height, width = arr1.shape
+            if cv2 is not None:
+                arr2 = cv2.resize(arr2, (width, height), interpolation=cv2.INTER_AREA)
+            else:
+                arr2 = np.asarray(Image.fromarray(arr2).resize((width, height)), dtype=np.float32)
+
+        return arr1, arr2
 
     def get_summary(self) -> Dict[str, Any]:
         """Get verification summary."""
@@ -432,9 +678,10 @@ class UIVerifier:
 
     def generate_html_report(self, output_path: Path):
         """Generate HTML report with verification results and diffs."""
+        self.wait_for_writes()
         summary = self.get_summary()
 
-        html = f"""
+        parts = [f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -483,7 +730,7 @@ class UIVerifier:
                 <tr><th>Pass Rate</th><td><strong>{summary['pass_rate']}</strong></td></tr>
             </table>
         </div>
-        """
+        """]
 
         # Group results by checkpoint
         checkpoints = {}
@@ -492,121 +739,131 @@ class UIVerifier:
                 checkpoints[result.checkpoint] = []
             checkpoints[result.checkpoint].append(result)
 
+        # Map checkpoints to baseline screenshots with one directory scan
+        # ("<checkpoint>_*.png" preferred over "<checkpoint>.png", as the globs did)
+        prefixed_baselines = {}
+        exact_baselines = {}
+        with os.scandir(self.baseline_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith('.png'):
+                    continue
+                for checkpoint in checkpoints:
+                    if name == f"{checkpoint}.png":
+                        exact_baselines.setdefault(checkpoint, Path(entry.path))
+                    elif name.startswith(f"{checkpoint}_"):
+                        prefixed_baselines.setdefault(checkpoint, Path(entry.path))
+
         # Render each checkpoint
         for checkpoint, results in checkpoints.items():
             passed = sum(1 for r in results if r.passed)
             total = len(results)
 
-            html += f"""
+            parts.append(f"""
         <div class="checkpoint">
             <h2>{checkpoint}</h2>
             <p>{passed}/{total} checks passed</p>
-            """
+            """)
 
             for result in results:
                 status_class = "pass" if result.passed else "fail"
                 status_icon = "✓" if result.passed else "✗"
 
-                html += f"""
+                parts.append(f"""
             <div class="result {status_class}">
                 <div class="result-name">{status_icon} {result.element_name}</div>
                 <div class="result-details">{result.details}</div>
-                """
+                """)
 
                 if result.baseline_value is not None and result.actual_value is not None:
-                    html += f"""
+                    parts.append(f"""
                 <div class="result-details">
                     Baseline: <span class="value">{result.baseline_value}</span> →
                     Actual: <span class="value">{result.actual_value}</span>
                 </div>
-                """
+                """)
 
                 if result.similarity_score is not None:
-                    html += f"""
+                    parts.append(f"""
                 <div class="result-details">Similarity: {result.similarity_score:.2%}</div>
-                """
+                """)
 
-                html += """
+                parts.append("""
             </div>
-                """
+                """)
 
             # Add screenshots section
-            html += """
+            parts.append("""
             <div class="screenshots">
                 <h3>📷 Screenshot Comparison</h3>
-            """
+            """)
 
             # Full screenshot comparison
-            baseline_screenshot = None
             current_screenshot = None
 
             # Find baseline screenshot
-            for pattern in [f"{checkpoint}_*.png", f"{checkpoint}.png"]:
-                matches = list(self.baseline_dir.glob(pattern))
-                if matches:
-                    baseline_screenshot = matches[0]
-                    break
+            baseline_screenshot = prefixed_baselines.get(checkpoint) or exact_baselines.get(checkpoint)
 
             # Find current screenshot
             if checkpoint in self.current_screenshots:
                 current_screenshot = self.current_screenshots[checkpoint]
 
             if baseline_screenshot or current_screenshot:
-                html += '<div class="screenshot-grid">'
+                parts.append('<div class="screenshot-grid">')
 
                 if baseline_screenshot and baseline_screenshot.exists():
                     rel_path = baseline_screenshot.relative_to(self.baseline_dir.parent)
-                    html += f"""
+                    parts.append(f"""
                 <div class="screenshot-item">
                     <h4>Baseline</h4>
                     <img src="../{rel_path}" alt="Baseline Screenshot" onclick="window.open(this.src, '_blank')">
                 </div>
-                    """
+                    """)
 
                 if current_screenshot and current_screenshot.exists():
                     rel_path = current_screenshot.relative_to(self.baseline_dir.parent)
-                    html += f"""
+                    parts.append(f"""
                 <div class="screenshot-item">
                     <h4>Current Run</h4>
                     <img src="../{rel_path}" alt="Current Screenshot" onclick="window.open(this.src, '_blank')">
                 </div>
-                    """
+                    """)
 
-                html += '</div>'
+                parts.append('</div>')
 
             # Region comparisons
             baseline_regions = self.baseline_regions.get(checkpoint, [])
             if baseline_regions:
-                html += '<div class="region-grid" style="margin-top: 20px;">'
+                parts.append('<div class="region-grid" style="margin-top: 20px;">')
 
                 for region in baseline_regions:
                     baseline_region_path = self.baseline_dir / f"{checkpoint}_{region.name}_region.png"
                     if baseline_region_path.exists():
                         rel_path = baseline_region_path.relative_to(self.baseline_dir.parent)
-                        html += f"""
+                        parts.append(f"""
                 <div class="region-item">
                     <h4>Region: {region.name}</h4>
                     <img src="../{rel_path}" alt="Region: {region.name}" onclick="window.open(this.src, '_blank')">
                 </div>
-                        """
+                        """)
 
-                html += '</div>'
+                parts.append('</div>')
 
-            html += """
+            parts.append("""
             </div>
-            """
+            """)
 
-            html += """
+            parts.append("""
         </div>
-            """
+            """)
 
-        html += """
+        parts.append("""
     </div>
 </body>
 </html>
-        """
+        """)
 
-        with open(output_path, 'w') as f:
-            f.write(html)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write("".join(parts))
 
         logger.info(f"UI verification report saved: {output_path}")
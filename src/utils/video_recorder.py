@@ -4,13 +4,17 @@ Video Recorder for Android device
 Records screen via ADB screenrecord with timestamp synchronization
 for correlation with memory/performance data.
 """
+import shlex
 import subprocess
 import threading
 import time
 import logging
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Union, List
+from typing import Deque, Optional, Union, List, Tuple
+
+from .adb_utils import AdbShell, shared_shell
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +22,9 @@ logger = logging.getLogger(__name__)
 class VideoRecorder:
     """Record Android screen with timestamp tracking."""
 
-    def __init__(self, device_id: str = None, output_dir: Path = None):
+    def __init__(self, device_id: str = None, output_dir: Path = None,
+                 shell: Optional[AdbShell] = None,
+                 remote_path: str = "/sdcard/test_recording.mp4"):
         self.device_id = device_id
         self.output_dir = output_dir or Path("reports/videos")
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -26,11 +32,20 @@ class VideoRecorder:
         self._recording = False
         self._process: Optional[subprocess.Popen] = None
         self._start_time: Optional[datetime] = None
+        self._start_monotonic: float = 0.0  # for elapsed time, immune to clock jumps
         self._video_path: Optional[Path] = None
-        self._remote_path = "/sdcard/test_recording.mp4"
+        self._remote_path = remote_path
+
+        # Short shell commands go through the device's shared `adb shell`. A
+        # shell passed in (by ChainedVideoRecorder) is closed by its owner
+        self._owns_shell = shell is None
+        self._shell = shell or shared_shell(device_id)
 
     def _adb(self, *args, background=False) -> Union[subprocess.Popen, str]:
         """Execute ADB command."""
+        if not background and args and args[0] == "shell":
+            return self._shell.run(shlex.join(args[1:]))
+
         cmd = ["adb"]
         if self.device_id:
             cmd.extend(["-s", self.device_id])
@@ -56,21 +71,24 @@ class VideoRecorder:
             logger.warning("Recording already in progress")
             return self._start_time
 
-        # Clean up any existing recording
-        self._adb("shell", "rm", "-f", self._remote_path)
-
         # Start recording in background
         # screenrecord has 180s limit, but we can chain recordings if needed
         logger.info(f"Starting video recording (max {max_duration}s)...")
-        self._process = self._adb(
-            "shell", "screenrecord",
+        screenrecord = shlex.join([
+            "screenrecord",
             "--time-limit", str(min(max_duration, 180)),
             "--bit-rate", "4000000",  # 4 Mbps for good quality
             self._remote_path,
+        ])
+        # Clean up any existing recording in the same adb shell session;
+        # exec keeps screenrecord as the process pkill -INT stops later
+        self._process = self._adb(
+            "shell", f"rm -f {shlex.quote(self._remote_path)}; exec {screenrecord}",
             background=True
         )
 
         self._start_time = datetime.now()
+        self._start_monotonic = time.monotonic()
         self._recording = True
         logger.info(f"Recording started at {self._start_time.isoformat()}")
 
@@ -87,33 +105,53 @@ class VideoRecorder:
             logger.warning("No recording in progress")
             return None
 
+        self._end_recording()
+        return self._pull_video()
+
+    def _end_recording(self):
+        """Stop screenrecord and wait until the file on the device is final."""
         logger.info("Stopping video recording...")
 
         # Send interrupt to stop screenrecord gracefully
         if self._process:
-            # Kill screenrecord on device
+            # Kill screenrecord on device. It exits once the mp4 is finalized,
+            # which ends our `adb shell screenrecord` process too
             self._adb("shell", "pkill", "-INT", "screenrecord")
-            time.sleep(2)  # Wait for file to be finalized
-
             try:
-                self._process.terminate()
-            except:
-                pass
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                logger.warning("screenrecord did not exit after SIGINT, terminating")
+                try:
+                    self._process.terminate()
+                except:
+                    pass
 
         self._recording = False
 
+    def _pull_video(self) -> Optional[Path]:
+        """Pull the finished recording from the device and remove it there."""
         # Generate output filename with timestamp
         timestamp = self._start_time.strftime("%Y%m%d_%H%M%S")
         self._video_path = self.output_dir / f"recording_{timestamp}.mp4"
 
-        # Pull video from device
-        logger.info(f"Pulling video to {self._video_path}...")
-        self._adb("pull", self._remote_path, str(self._video_path))
+        # Pull video from device, unless it is empty (failed recording) or
+        # already here from an earlier pull
+        size_out = self._adb("shell", "stat", "-c", "%s", self._remote_path).strip()
+        remote_size = int(size_out) if size_out.isdigit() else 0
+        if remote_size == 0:
+            logger.warning(f"No recording on device at {self._remote_path}")
+        elif self._video_path.exists() and self._video_path.stat().st_size == remote_size:
+            logger.info(f"Video already pulled to {self._video_path}")
+        else:
+            logger.info(f"Pulling video to {self._video_path}...")
+            self._adb("pull", self._remote_path, str(self._video_path))
 
         # Clean up remote file
         self._adb("shell", "rm", "-f", self._remote_path)
+        if self._owns_shell:
+            self._shell.close()
 
-        if self._video_path.exists():
+        if remote_size and self._video_path.exists():
             size_mb = self._video_path.stat().st_size / (1024 * 1024)
             logger.info(f"Video saved: {self._video_path} ({size_mb:.1f} MB)")
             return self._video_path
@@ -123,8 +161,8 @@ class VideoRecorder:
 
     def get_elapsed_seconds(self) -> float:
         """Get elapsed time since recording started."""
-        if self._start_time:
-            return (datetime.now() - self._start_time).total_seconds()
+        if self._start_monotonic:
+            return time.monotonic() - self._start_monotonic
         return 0.0
 
     @property
@@ -153,38 +191,65 @@ class ChainedVideoRecorder:
 
         self._recording = False
         self._start_time: Optional[datetime] = None
-        self._videos: List[Path] = []
+        self._start_monotonic: float = 0.0
+        self._videos: Deque[Path] = deque()  # appended by the chain thread
         self._current_recorder: Optional[VideoRecorder] = None
         self._chain_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._shell = shared_shell(device_id)  # used by all chunk recorders
 
     def _chain_recordings(self, chunk_duration: int = 170):
-        """Background thread to chain recordings."""
-        while not self._stop_event.is_set():
-            # Start a new chunk
-            self._current_recorder = VideoRecorder(self.device_id, self.output_dir)
-            self._current_recorder.start(max_duration=chunk_duration)
-
-            # Wait for chunk to complete or stop signal
-            for _ in range(chunk_duration):
-                if self._stop_event.is_set():
-                    break
-                time.sleep(1)
-
-            # Stop current chunk
-            video_path = self._current_recorder.stop()
+        """
+        Background thread to chain recordings.
+
+        When a chunk ends, the next one is started before the finished one is
+        pulled, so the pull overlaps recording instead of leaving a gap in the
+        video. Chunks alternate between two files on the device for this.
+        """
+        chunk = 0
+        recorder = self._start_chunk(chunk, chunk_duration)
+
+        while True:
+            # Wait for chunk to complete or stop signal. The chunk started
+            # before the previous pull, so only its remaining time is left
+            remaining = chunk_duration - recorder.get_elapsed_seconds()
+            stopped = self._stop_event.wait(timeout=max(remaining, 0))
+
+            # Stop current chunk (only one screenrecord may run at a time)
+            recorder._end_recording()
+
+            if not stopped:
+                chunk += 1
+                next_recorder = self._start_chunk(chunk, chunk_duration)
+
+            video_path = recorder._pull_video()
             if video_path and video_path.exists():
                 self._videos.append(video_path)
 
+            if stopped:
+                break
+            recorder = next_recorder
+
+    def _start_chunk(self, chunk: int, chunk_duration: int) -> VideoRecorder:
+        """Start recording chunk number `chunk`."""
+        recorder = VideoRecorder(
+            self.device_id, self.output_dir, shell=self._shell,
+            remote_path=f"/sdcard/test_recording_{chunk % 2}.mp4"
+        )
+        recorder.start(max_duration=chunk_duration)
+        self._current_recorder = recorder
+        return recorder
+
     def start(self) -> datetime:
         """Start chained recording."""
         if self._recording:
             return self._start_time
 
         self._start_time = datetime.now()
+        self._start_monotonic = time.monotonic()
         self._recording = True
         self._stop_event.clear()
-        self._videos = []
+        self._videos = deque()
 
         # Start chaining thread
         self._chain_thread = threading.Thread(target=self._chain_recordings, daemon=True)
@@ -201,23 +266,18 @@ class ChainedVideoRecorder:
         self._stop_event.set()
         self._recording = False
 
-        # Stop current recorder
-        if self._current_recorder and self._current_recorder.is_recording:
-            video_path = self._current_recorder.stop()
-            if video_path and video_path.exists():
-                self._videos.append(video_path)
-
-        # Wait for chain thread to finish
+        # The chain thread stops and pulls the current chunk
         if self._chain_thread:
-            self._chain_thread.join(timeout=5)
+            self._chain_thread.join()
+        self._shell.close()
 
         logger.info(f"Recording stopped. {len(self._videos)} video chunk(s) saved.")
-        return self._videos
+        return list(self._videos)
 
     def get_elapsed_seconds(self) -> float:
         """Get elapsed time since recording started."""
-        if self._start_time:
-            return (datetime.now() - self._start_time).total_seconds()
+        if self._start_monotonic:
+            return time.monotonic() - self._start_monotonic
         return 0.0
 
     @property
@@ -225,5 +285,6 @@ class ChainedVideoRecorder:
         return self._start_time
 
     @property
-    def videos(self) -> List[Path]:
-        return self._videos
+    def videos(self) -> Tuple[Path, ...]:
+        """Snapshot of the chunks pulled so far."""
+        return tuple(self._videos)
@@ -1,8 +1,9 @@
 """
 Custom wait utilities for Appium tests.
 """
+import functools
 import logging
-from typing import Callable, TypeVar, Optional
+from typing import Callable, Dict, Tuple, TypeVar, Optional
 
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,6 +15,25 @@ from appium.webdriver.webelement import WebElement
 logger = logging.getLogger(__name__)
 T = TypeVar('T')
 
+# Android 11 (API 30) stopped exposing most toasts in the view hierarchy
+TOAST_UNRELIABLE_API_LEVEL = 30
+
+
+def _xpath_literal(text: str) -> str:
+    """Quote text as an XPath string literal, using concat() if it has both quote types."""
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+@functools.lru_cache(maxsize=128)
+def _toast_xpath(text: str) -> str:
+    """XPath matching a Toast whose text contains `text`."""
+    return f"//android.widget.Toast[contains(@text, {_xpath_literal(text)})]"
+
 
 class WaitUtils:
     """Utility class for various wait operations."""
@@ -28,12 +48,25 @@ class WaitUtils:
         """
         self.driver = driver
         self.default_timeout = default_timeout
+        # WebDriverWait keeps no state between until() calls, so one per
+        # (timeout, poll_frequency) is reused for every wait
+        self._waits: Dict[Tuple[float, float], WebDriverWait] = {}
+        self._toast_warned = False
+
+    def _get_wait(self, timeout: float, poll_frequency: float = 0.5) -> WebDriverWait:
+        """Shared WebDriverWait for the given timeout and poll frequency."""
+        key = (timeout, poll_frequency)
+        wait = self._waits.get(key)
+        if wait is None:
+            wait = self._waits[key] = WebDriverWait(self.driver, timeout, poll_frequency=poll_frequency)
+        return wait
 
     def wait_for_element(
         self,
         locator: tuple,
         timeout: Optional[int] = None,
-        condition: str = 'visible'
+        condition: str = 'visible',
+        poll_frequency: float = 0.25
     ) -> WebElement:
         """
         Wait for element with specified condition.
@@ -42,6 +75,7 @@ class WaitUtils:
             locator: Tuple of (By, value)
             timeout: Wait timeout
             condition: 'visible', 'clickable', 'present'
+            poll_frequency: How often to check condition
 
         Returns:
             WebElement when found
@@ -62,14 +96,15 @@ class WaitUtils:
 
         logger.debug(f"Waiting for element {locator} to be {condition}")
 
-        return WebDriverWait(self.driver, timeout).until(
+        return self._get_wait(timeout, poll_frequency).until(
             conditions[condition](locator)
         )
 
     def wait_for_element_gone(
         self,
         locator: tuple,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        poll_frequency: float = 0.25
     ) -> bool:
         """
         Wait until element is no longer visible.
@@ -77,6 +112,7 @@ class WaitUtils:
         Args:
             locator: Tuple of (By, value)
             timeout: Wait timeout
+            poll_frequency: How often to check condition
 
         Returns:
             True when element is gone
@@ -85,7 +121,7 @@ class WaitUtils:
 
         logger.debug(f"Waiting for element {locator} to disappear")
 
-        return WebDriverWait(self.driver, timeout).until(
+        return self._get_wait(timeout, poll_frequency).until(
             EC.invisibility_of_element_located(locator)
         )
 
@@ -93,7 +129,8 @@ class WaitUtils:
         self,
         locator: tuple,
         text: str,
-        timeout: Optional[int] = None
+        timeout: Optional[int] = None,
+        poll_frequency: float = 0.25
     ) -> bool:
         """
         Wait until element contains specified text.
@@ -102,6 +139,7 @@ class WaitUtils:
             locator: Tuple of (By, value)
             text: Expected text (partial match)
             timeout: Wait timeout
+            poll_frequency: How often to check condition
 
         Returns:
             True when text is present
@@ -110,7 +148,7 @@ class WaitUtils:
 
         logger.debug(f"Waiting for text '{text}' in element {locator}")
 
-        return WebDriverWait(self.driver, timeout).until(
+        return self._get_wait(timeout, poll_frequency).until(
             EC.text_to_be_present_in_element(locator, text)
         )
 
@@ -131,13 +169,16 @@ class WaitUtils:
         """
         timeout = timeout or self.default_timeout
 
+        # current_activity is a round trip per poll - keep the default 0.5s
         def activity_is_current(driver):
             current = driver.current_activity
-            return activity in current if current else False
+            if not current:
+                return False
+            return activity in current
 
         logger.debug(f"Waiting for activity: {activity}")
 
-        return WebDriverWait(self.driver, timeout).until(activity_is_current)
+        return self._get_wait(timeout).until(activity_is_current)
 
     def wait_for_condition(
         self,
@@ -158,11 +199,7 @@ class WaitUtils:
         """
         timeout = timeout or self.default_timeout
 
-        return WebDriverWait(
-            self.driver,
-            timeout,
-            poll_frequency=poll_frequency
-        ).until(condition)
+        return self._get_wait(timeout, poll_frequency).until(condition)
 
     def is_element_present(
         self,
@@ -179,11 +216,19 @@ class WaitUtils:
         Returns:
             True if element exists, False otherwise
         """
+        # One find_element bounded by the implicit wait, rather than
+        # polling it. The driver's own implicit wait is read fresh each time
+        # (tests may change it between checks) and restored afterwards
+        implicit_wait = self.driver.timeouts.implicit_wait
+
+        self.driver.implicitly_wait(timeout)
         try:
-            self.wait_for_element(locator, timeout=timeout, condition='present')
+            self.driver.find_element(*locator)
             return True
-        except TimeoutException:
+        except NoSuchElementException:
             return False
+        finally:
+            self.driver.implicitly_wait(implicit_wait)
 
     def wait_for_toast(
         self,
@@ -202,10 +247,16 @@ class WaitUtils:
         """
         timeout = timeout or 10
 
-        toast_locator = (
-            By.XPATH,
-            f"//android.widget.Toast[contains(@text, '{text}')]"
-        )
+        if not self._toast_warned:
+            self._toast_warned = True
+            api_level = self.driver.capabilities.get('deviceApiLevel')
+            if api_level and int(api_level) >= TOAST_UNRELIABLE_API_LEVEL:
+                logger.warning(
+                    f"Device API level {api_level}: toasts are often missing from the "
+                    "view hierarchy, prefer checking logcat"
+                )
+
+        toast_locator = (By.XPATH, _toast_xpath(text))
 
         try:
             self.wait_for_element(toast_locator, timeout=timeout, condition='present')
@@ -8,9 +8,11 @@ Provides:
 - Common test data fixtures
 """
 
+import base64
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Generator
@@ -22,9 +24,13 @@ from appium.webdriver.webdriver import WebDriver
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.utils.driver_factory import DriverFactory
+from src.utils.wait_utils import WaitUtils
 
 logger = logging.getLogger(__name__)
 
+# Failure screenshots are decoded and written here, off the report hook
+_screenshot_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="failure-screenshot")
+
 
 # === CLI Options ===
 
@@ -59,44 +65,70 @@ def device_udid(request) -> str:
 # === Driver Fixtures ===
 
 @pytest.fixture(scope="session")
-def driver_factory() -> DriverFactory:
-    """Create DriverFactory instance."""
-    return DriverFactory()
+def driver_factory() -> Generator[DriverFactory, None, None]:
+    """
+    Create DriverFactory instance.
 
+    Set REUSE_APPIUM_SESSION=1 to share one Appium session across tests.
+    """
+    factory = DriverFactory(reuse_sessions=os.getenv("REUSE_APPIUM_SESSION") == "1")
+    yield factory
+    factory.shutdown_pool()
 
-@pytest.fixture(scope="function")
-def driver(driver_factory: DriverFactory, platform: str) -> Generator[WebDriver, None, None]:
+
+def _reset_app(_driver: WebDriver, platform: str) -> None:
+    """Restart the app over the Appium session and wait for the foreground."""
+    package = "com.roadlords.android"
+
+    if platform not in ["real_device", "emulator"]:
+        return
+    try:
+        _driver.terminate_app(package)
+    except Exception as e:
+        logger.warning(f"Could not force-stop app: {e}")
+    try:
+        _driver.activate_app(package)
+        WaitUtils(_driver).wait_for_condition(
+            lambda d: d.current_package == package, timeout=10
+        )
+    except Exception as e:
+        logger.warning(f"Could not activate app: {e}")
+
+
+@pytest.fixture(scope="session")
+def session_driver(driver_factory: DriverFactory, platform: str) -> Generator[WebDriver, None, None]:
     """
-    Create Appium driver for each test.
+    Create one Appium driver shared by all non-isolated tests.
 
-    Ensures clean app state before test and quits driver after.
+    The session handshake is paid once; quit at the end of the run.
     """
-    import subprocess
-    import time
+    _driver = driver_factory.create_driver(platform=platform)
+    logger.info(f"Session driver created on platform: {platform}")
+    try:
+        yield _driver
+    finally:
+        driver_factory.quit_driver(_driver)
 
-    package = "com.roadlords.android"
 
-    # Force stop app before test
-    if platform in ["real_device", "emulator"]:
-        try:
-            subprocess.run(["adb", "shell", "am", "force-stop", package], timeout=5, check=False)
-            time.sleep(1)
-        except Exception as e:
-            logger.warning(f"Could not force-stop app: {e}")
+@pytest.fixture(scope="function")
+def driver(request, driver_factory: DriverFactory, platform: str) -> Generator[WebDriver, None, None]:
+    """
+    Provide an Appium driver with a freshly restarted app for each test.
+
+    Reuses the session driver; tests marked @pytest.mark.isolated get
+    their own driver, created and quit around the test.
+    """
+    if not request.node.get_closest_marker("isolated"):
+        _driver = request.getfixturevalue("session_driver")
+        _reset_app(_driver, platform)
+        yield _driver
+        return
 
     _driver = None
     try:
         _driver = driver_factory.create_driver(platform=platform)
         logger.info(f"Driver created on platform: {platform}")
-
-        # Activate app
-        if platform in ["real_device", "emulator"]:
-            try:
-                _driver.activate_app(package)
-                time.sleep(3)
-            except Exception as e:
-                logger.warning(f"Could not activate app: {e}")
-
+        _reset_app(_driver, platform)
         yield _driver
     finally:
         if _driver:
@@ -120,17 +152,32 @@ def pytest_runtest_makereport(item, call):
                 reports_dir.mkdir(parents=True, exist_ok=True)
 
                 screenshot_path = reports_dir / f"failure_{item.name}_{timestamp}.png"
-                driver.save_screenshot(str(screenshot_path))
-                logger.info(f"Failure screenshot: {screenshot_path}")
+                png_b64 = driver.get_screenshot_as_base64()
+                _screenshot_pool.submit(_write_screenshot, screenshot_path, png_b64)
             except Exception as e:
                 logger.error(f"Failed to capture screenshot: {e}")
 
 
+def _write_screenshot(path: Path, png_b64: str) -> None:
+    """Decode a base64 screenshot and write it as PNG."""
+    try:
+        path.write_bytes(base64.b64decode(png_b64))
+        logger.info(f"Failure screenshot: {path}")
+    except Exception as e:
+        logger.error(f"Failed to save screenshot: {e}")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Wait for pending failure screenshots."""
+    _screenshot_pool.shutdown(wait=True)
+
+
 def pytest_configure(config):
     """Configure pytest markers."""
     config.addinivalue_line("markers", "smoke: Quick smoke tests")
     config.addinivalue_line("markers", "e2e: End-to-end tests")
     config.addinivalue_line("markers", "gps: Tests requiring GPS simulation")
+    config.addinivalue_line("markers", "isolated: Tests that need their own Appium session")
 
 
 # === Test Data ===
@@ -19,9 +19,11 @@ Usage:
     python tests/e2e/test_bratislava_svidnik.py
 """
 
+import functools
+import os
 import time
-import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -30,22 +32,25 @@ from appium.options.android import UiAutomator2Options
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
+from src.utils.adb_utils import ADBUtils, shared_shell
 from src.utils.memory_monitor import MemoryMonitor
 from src.utils.video_recorder import VideoRecorder
 from src.utils.report_generator import generate_report_from_test_data
 from src.utils.ui_verifier import UIVerifier
-from src.gps import GPSMockController
+from src.gps import GPSMockController, RoutePlan
 
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+LOG_BANNER = "=" * 50  # separates the test steps in the log
 
 
 # =============================================================================
@@ -71,7 +76,41 @@ DEVICE_UDID = get_connected_device()
 START_LAT = 48.1270
 START_LON = 17.1072
 DESTINATION = "Sustekova 5, Bratislava"
-GPX_FILE = Path(__file__).parent.parent.parent / "src/data/routes/pifflova_sustekova_petrzalka.gpx"
+GPX_FILE = PROJECT_ROOT / "src/data/routes/pifflova_sustekova_petrzalka.gpx"
+
+# Report output
+REPORTS_DIR = PROJECT_ROOT / "reports"
+E2E_REPORTS_DIR = REPORTS_DIR / "e2e"
+UI_BASELINE_DIR = REPORTS_DIR / "ui_baseline"
+
+# Element locators. Text lookups use UiSelector, which UiAutomator resolves
+# on the device directly - an XPath query first dumps the whole UI tree to
+# XML. XPath is kept only where the query is structural.
+_UI = AppiumBy.ANDROID_UIAUTOMATOR
+DISMISS_TEXTS = ["OK", "SKIP", "ALLOW", "GOT IT", "CONTINUE", "ACCEPT"]
+LOCATORS = {
+    "dismiss_dialog": (_UI, f'new UiSelector().textMatches("(?s).*({"|".join(DISMISS_TEXTS)}).*")'),
+    "search": (_UI, 'new UiSelector().text("Search")'),
+    "cancel_route": (_UI, 'new UiSelector().text("Cancel route")'),
+    "search_input": (AppiumBy.CLASS_NAME, "android.widget.EditText"),
+    "first_result": (AppiumBy.XPATH, "//android.view.View[@clickable='true'][.//android.widget.TextView][1]"),
+    "get_directions": (_UI, 'new UiSelector().textContains("Get directions")'),
+    "attention_ok_got_it": (_UI, 'new UiSelector().textContains("OK, got it")'),
+    "attention_ok": (_UI, 'new UiSelector().textContains("OK")'),
+    "start_button": (_UI, 'new UiSelector().className("android.widget.Button").clickable(true)'),
+    "any_button": (AppiumBy.CLASS_NAME, "android.widget.Button"),
+    "arrived": (_UI, 'new UiSelector().textContains("reached your destination")'),
+    "close": (_UI, 'new UiSelector().text("Close")'),
+}
+
+# Visual regions compared per UI checkpoint: (name, x, y, width, height)
+UI_REGIONS = {
+    "search_opened": ("search_area", 0, 0, 1440, 500),
+    "search_results": ("results_list", 0, 300, 1440, 800),
+    "destination_selected": ("destination_panel", 0, 400, 1440, 800),
+    "navigation_started": ("navigation_header", 0, 0, 1440, 300),
+    "arrived": ("arrival_dialog", 200, 400, 1040, 600),
+}
 
 # App packages
 ROADLORDS_PACKAGE = "com.roadlords.android"
@@ -81,14 +120,25 @@ GPS_MOCK_PACKAGE = "com.roadlords.gpsmock"
 TOTAL_DRIVE_TIME = 120  # Max navigation duration (seconds)
 BASELINE_SECONDS = 20   # Initial baseline period
 GPS_SPEED_KMH = 50.0    # GPS playback speed
+MEMORY_INTERVAL_BURST = 1   # Memory sampling during route start (seconds)
+MEMORY_INTERVAL_STEADY = 5  # Memory sampling once navigation is underway
+# Navigation screenshots: taken when PSS moved by SCREENSHOT_PSS_DELTA_MB since
+# the last one, and at least every SCREENSHOT_MAX_GAP seconds
+SCREENSHOT_PSS_DELTA_MB = 5.0
+SCREENSHOT_MAX_GAP = 60
+# Arrival polling: coarse until ARRIVAL_FINE_FROM of the expected ETA, then fine
+ARRIVAL_POLL_COARSE = 15
+ARRIVAL_POLL_FINE = 2
+ARRIVAL_FINE_FROM = 0.8
 
 # UI Verification: None, "capture", or "verify"
 # Auto-switches to "capture" if baseline doesn't exist
 UI_VERIFY_MODE = "verify"
 
+@functools.lru_cache(maxsize=1)
 def get_ui_verify_mode():
-    """Auto-detect UI verify mode - use capture if no baseline exists"""
-    baseline_file = Path(__file__).parent.parent.parent / "reports/ui_baseline/baseline.json"
+    """Auto-detect UI verify mode - use capture if no baseline exists (decided once per run)"""
+    baseline_file = UI_BASELINE_DIR / "baseline.json"
     if UI_VERIFY_MODE == "verify" and not baseline_file.exists():
         print("⚠️  No baseline found - switching to 'capture' mode for first run")
         return "capture"
@@ -158,25 +208,26 @@ class RoadlordsAutomation:
     def handle_initial_dialogs(self):
         """Dismiss initial permission/info dialogs."""
         logger.info("Handling initial dialogs...")
-        dismiss_texts = ["OK", "SKIP", "ALLOW", "GOT IT", "CONTINUE", "ACCEPT"]
 
-        for _ in range(3):
-            for text in dismiss_texts:
+        # One query for all dismiss buttons (DISMISS_TEXTS); find_elements
+        # returns [] right away once no dialog is left
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            elements = self.driver.find_elements(*LOCATORS["dismiss_dialog"])
+            if not elements:
+                break
+            for elem in elements:
                 try:
-                    elem = self.driver.find_element(
-                        AppiumBy.XPATH, f"//*[contains(@text, '{text}')]"
-                    )
                     elem.click()
-                    time.sleep(1)
-                except Exception:
-                    pass
-            time.sleep(1)
+                except StaleElementReferenceException:
+                    pass  # gone with the dialog an earlier click closed
+            time.sleep(0.3)  # let the next dialog (if any) come up
 
     def open_search(self):
         """Open search panel."""
         logger.info("Opening search...")
         try:
-            elem = self.driver.find_element(AppiumBy.XPATH, "//*[@text='Search']")
+            elem = self.driver.find_element(*LOCATORS["search"])
             elem.click()
             time.sleep(2)
             return True
@@ -188,7 +239,7 @@ class RoadlordsAutomation:
     def cancel_previous_route(self):
         """Cancel any previous route dialog ('Are you still heading to...')."""
         try:
-            btn = self.driver.find_element(AppiumBy.XPATH, "//*[@text='Cancel route']")
+            btn = self.driver.find_element(*LOCATORS["cancel_route"])
             logger.info("Found 'Cancel route' dialog - canceling previous route")
             btn.click()
             time.sleep(2)
@@ -209,12 +260,19 @@ class RoadlordsAutomation:
         self.tap_at(400, 185)
         time.sleep(2)
 
-        # Type destination
+        # Type destination - the whole string in one command into the focused
+        # field; send_keys on the EditText if the driver lacks "mobile: type"
         try:
-            edit = self.driver.find_element(AppiumBy.CLASS_NAME, "android.widget.EditText")
-            edit.send_keys(destination)
+            try:
+                self.driver.execute_script("mobile: type", {"text": destination})
+            except Exception:
+                edit = self.driver.find_element(*LOCATORS["search_input"])
+                edit.send_keys(destination)
             time.sleep(1)
-            subprocess.run(["adb", "shell", "input", "keyevent", "KEYCODE_BACK"], check=False)
+            try:
+                self.driver.hide_keyboard()
+            except Exception:
+                pass
             time.sleep(2)
             return True
         except Exception as e:
@@ -228,10 +286,7 @@ class RoadlordsAutomation:
 
         # Try clickable result row
         try:
-            result = self.driver.find_element(
-                AppiumBy.XPATH,
-                "//android.view.View[@clickable='true'][.//android.widget.TextView][1]"
-            )
+            result = self.driver.find_element(*LOCATORS["first_result"])
             result.click()
             time.sleep(3)
             return True
@@ -249,9 +304,7 @@ class RoadlordsAutomation:
         time.sleep(3)
 
         try:
-            elem = self.driver.find_element(
-                AppiumBy.XPATH, "//*[contains(@text, 'Get directions')]"
-            )
+            elem = self.driver.find_element(*LOCATORS["get_directions"])
             loc = elem.location
             size = elem.size
             self.tap_at(loc['x'] + size['width'] // 2, loc['y'] + size['height'] // 2)
@@ -265,12 +318,12 @@ class RoadlordsAutomation:
     def dismiss_attention_dialog(self):
         """Dismiss route warning dialog if present."""
         patterns = [
-            "//*[contains(@text, 'OK, got it')]",
-            "//*[contains(@text, 'OK')]",
+            LOCATORS["attention_ok_got_it"],
+            LOCATORS["attention_ok"],
         ]
-        for xpath in patterns:
+        for by, value in patterns:
             try:
-                elem = self.find_element_safe(AppiumBy.XPATH, xpath, timeout=3)
+                elem = self.find_element_safe(by, value, timeout=3)
                 if elem:
                     elem.click()
                     time.sleep(2)
@@ -284,8 +337,8 @@ class RoadlordsAutomation:
         logger.info("Starting navigation...")
 
         patterns = [
-            (AppiumBy.XPATH, "//android.widget.Button[@clickable='true']"),
-            (AppiumBy.CLASS_NAME, "android.widget.Button"),
+            LOCATORS["start_button"],
+            LOCATORS["any_button"],
         ]
 
         for by, value in patterns:
@@ -313,23 +366,14 @@ class RoadlordsAutomation:
 
             if checkpoint == "search_opened":
                 try:
-                    elem = self.driver.find_element(AppiumBy.CLASS_NAME, "android.widget.EditText")
+                    elem = self.driver.find_element(*LOCATORS["search_input"])
                     ui_verifier.add_element(checkpoint, "search_bar", elem)
                 except Exception:
                     pass
-                ui_verifier.add_region(checkpoint, "search_area", x=0, y=0, width=1440, height=500)
-
-            elif checkpoint == "search_results":
-                ui_verifier.add_region(checkpoint, "results_list", x=0, y=300, width=1440, height=800)
-
-            elif checkpoint == "destination_selected":
-                ui_verifier.add_region(checkpoint, "destination_panel", x=0, y=400, width=1440, height=800)
-
-            elif checkpoint == "navigation_started":
-                ui_verifier.add_region(checkpoint, "navigation_header", x=0, y=0, width=1440, height=300)
 
-            elif checkpoint == "arrived":
-                ui_verifier.add_region(checkpoint, "arrival_dialog", x=200, y=400, width=1040, height=600)
+            if checkpoint in UI_REGIONS:
+                name, x, y, width, height = UI_REGIONS[checkpoint]
+                ui_verifier.add_region(checkpoint, name, x=x, y=y, width=width, height=height)
 
             logger.info(f"Captured UI: {checkpoint}")
 
@@ -341,8 +385,8 @@ class RoadlordsAutomation:
 # Driver Setup
 # =============================================================================
 
-def create_driver() -> webdriver.Remote:
-    """Create Appium driver for Roadlords."""
+def _build_options() -> UiAutomator2Options:
+    """Appium options for Roadlords (built once, see _DRIVER_OPTIONS)."""
     options = UiAutomator2Options()
     options.platform_name = "Android"
     options.device_name = DEVICE_UDID
@@ -353,11 +397,34 @@ def create_driver() -> webdriver.Remote:
     options.auto_grant_permissions = True
     options.new_command_timeout = 300
     options.app_wait_activity = "*"
+    return options
+
+
+_DRIVER_OPTIONS = _build_options()
 
+
+def create_driver() -> webdriver.Remote:
+    """Create Appium driver for Roadlords."""
     logger.info("Connecting to Appium...")
-    driver = webdriver.Remote(APPIUM_SERVER, options=options)
+    driver = webdriver.Remote(APPIUM_SERVER, options=_DRIVER_OPTIONS)
     logger.info("Connected")
 
+    # The UiAutomator2 server is now installed and the device set up - later
+    # sessions (retries, parametrized runs) skip both
+    _DRIVER_OPTIONS.skip_server_installation = True
+    _DRIVER_OPTIONS.skip_device_initialization = True
+
+    # Lookups that may miss (arrival polling, optional buttons) must not block
+    # on an implicit wait; explicit waits go through WebDriverWait
+    driver.implicitly_wait(0)
+
+    # The map animates constantly during navigation, so the UI is never idle -
+    # without this every lookup first sits out UiAutomator2's 10 s idle wait
+    try:
+        driver.update_settings({"waitForIdleTimeout": 100, "waitForSelectorTimeout": 0})
+    except Exception as e:
+        logger.warning(f"Could not update UiAutomator2 settings: {e}")
+
     # Force landscape orientation (test coordinates are designed for landscape)
     try:
         driver.orientation = "LANDSCAPE"
@@ -374,89 +441,71 @@ def create_driver() -> webdriver.Remote:
 def run_test():
     """Run complete E2E navigation test with monitoring."""
     gps = GPSMockController(DEVICE_UDID)
+    adb_shell = shared_shell(DEVICE_UDID)
     driver = None
     mem_monitor = None
     video_recorder = None
     ui_verifier = None
+    screenshot_pool = None
 
     try:
         # Initialize UI Verifier if enabled
         actual_ui_mode = get_ui_verify_mode()
         if actual_ui_mode:
-            ui_baseline_dir = Path(__file__).parent.parent.parent / "reports/ui_baseline"
-            ui_verifier = UIVerifier(ui_baseline_dir, mode=actual_ui_mode)
+            ui_verifier = UIVerifier(UI_BASELINE_DIR, mode=actual_ui_mode)
             logger.info(f"UI Verification: {actual_ui_mode}")
 
         # --- Step 1: Force stop Roadlords and set GPS ---
-        logger.info("=" * 50)
-        logger.info("STEP 1: Setting GPS to starting position")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 1, "Setting GPS to starting position")
 
         # Force stop Roadlords and io.appium.settings (conflicts with GPS mock)
-        subprocess.run(["adb", "shell", "am", "force-stop", ROADLORDS_PACKAGE], capture_output=True)
-        subprocess.run(["adb", "shell", "am", "force-stop", "io.appium.settings"], capture_output=True)
-        time.sleep(1)
-
-        # Set our GPS Mock app as the mock location provider
-        subprocess.run(["adb", "shell", "settings", "put", "secure", "mock_location_app", "com.roadlords.gpsmock"], capture_output=True)
+        # and set our GPS Mock app as the mock location provider, all in one
+        # round trip over the device's persistent adb shell. The shell runs
+        # them in order and returns when the last one is done, so no sleep
+        adb_shell.run(
+            f"am force-stop {ROADLORDS_PACKAGE}; "
+            "am force-stop io.appium.settings; "
+            "settings put secure mock_location_app com.roadlords.gpsmock"
+        )
 
         # Start GPS mock and set position BEFORE launching app
         gps.start_service()
-        # Set location multiple times to ensure it's registered
-        for _ in range(5):
-            gps.set_location(START_LAT, START_LON)
-            time.sleep(1)
+        # The mock keeps reporting this fix; wait until the device has it
+        gps.set_location(START_LAT, START_LON)
+        gps.wait_until_position(START_LAT, START_LON)
         logger.info(f"GPS set to starting position: {START_LAT}, {START_LON}")
 
         # --- Step 2: Push GPX file ---
-        logger.info("=" * 50)
-        logger.info("STEP 2: Pushing GPX file")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 2, "Pushing GPX file")
         gpx_device_path = "/data/local/tmp/route.gpx"
         gps.push_gpx_file(str(GPX_FILE), gpx_device_path)
 
         # --- Step 3: Connect to app ---
-        logger.info("=" * 50)
-        logger.info("STEP 3: Connecting to Roadlords")
-
-        # Set GPS again right before launching
-        gps.set_location(START_LAT, START_LON)
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 3, "Connecting to Roadlords")
 
         driver = create_driver()
         app = RoadlordsAutomation(driver)
 
-        # Don't restart - app was just launched fresh
-        time.sleep(3)
-
-        # Set GPS again after app launch to override any cached location
-        for _ in range(3):
-            gps.set_location(START_LAT, START_LON)
-            time.sleep(1)
+        # Don't restart - app was just launched fresh. Wait until it is past
+        # the splash screen instead of sleeping a fixed time
+        try:
+            WebDriverWait(driver, 10, poll_frequency=0.2).until(
+                lambda d: d.current_activity and "Splash" not in d.current_activity
+            )
+        except TimeoutException:
+            logger.warning("App still on the splash screen after 10s, continuing")
 
         # Cancel any previous route dialog first
         app.cancel_previous_route()
 
-        # Set GPS multiple times to ensure app picks it up
-        gps.set_location(START_LAT, START_LON)
-        time.sleep(2)
-        gps.set_location(START_LAT, START_LON)
-        time.sleep(2)
-
         app.handle_initial_dialogs()
 
-        # Set GPS again before map loads
-        gps.set_location(START_LAT, START_LON)
-        time.sleep(3)
-
         app.wait_for_map_load()
 
-        # Final GPS set to ensure correct position
-        gps.set_location(START_LAT, START_LON)
-        time.sleep(2)
-
         app.tap_to_show_ui()
 
         # --- Step 4: Search for destination ---
-        logger.info("=" * 50)
-        logger.info("STEP 4: Searching for destination")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 4, "Searching for destination")
         app.open_search()
 
         if ui_verifier:
@@ -469,8 +518,7 @@ def run_test():
             app.capture_ui_elements(ui_verifier, "search_results")
 
         # --- Step 5: Select result and start navigation ---
-        logger.info("=" * 50)
-        logger.info("STEP 5: Starting navigation")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 5, "Starting navigation")
         app.select_first_result()
 
         if ui_verifier:
@@ -484,78 +532,95 @@ def run_test():
             app.capture_ui_elements(ui_verifier, "navigation_started")
 
         # --- Step 6: Start monitoring ---
-        logger.info("=" * 50)
-        logger.info("STEP 6: Starting monitoring")
-        reports_dir = Path(__file__).parent.parent.parent / "reports/e2e"
-        reports_dir.mkdir(parents=True, exist_ok=True)
-
-        video_recorder = VideoRecorder(device_id=DEVICE_UDID, output_dir=reports_dir / "videos")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 6, "Starting monitoring")
+        video_recorder = VideoRecorder(device_id=DEVICE_UDID, output_dir=E2E_REPORTS_DIR / "videos")
         video_recorder.start(max_duration=180)
 
         mem_monitor = MemoryMonitor(ROADLORDS_PACKAGE, DEVICE_UDID)
-        mem_monitor.start(interval_seconds=1)
+        mem_monitor.start(interval_seconds=MEMORY_INTERVAL_BURST)
         time.sleep(1)
 
         initial_mem = mem_monitor.get_memory_info()
         logger.info(f"Initial memory: {initial_mem.total_pss_mb:.1f} MB")
 
         # --- Step 7: GPS navigation ---
-        logger.info("=" * 50)
-        logger.info("STEP 7: GPS navigation")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 7, "GPS navigation")
         logger.info(f"Starting GPX playback at {GPS_SPEED_KMH} km/h")
         gps.play_gpx_route(gpx_device_path, speed_kmh=GPS_SPEED_KMH)
 
-        screenshots_dir = reports_dir / "screenshots"
+        screenshots_dir = E2E_REPORTS_DIR / "screenshots"
         screenshots_dir.mkdir(parents=True, exist_ok=True)
+        screenshots_prefix = str(screenshots_dir) + os.sep  # built once, not per poll
+        # Navigation screenshots are taken with adb screencap (no WebDriver
+        # round trip) on a worker, so they don't delay the next poll
+        screenshot_pool = ThreadPoolExecutor(max_workers=1)
+        adb = ADBUtils(DEVICE_UDID)
+
+        gpx_distance_km = RoutePlan.from_waypoints(
+            GPSMockController.parse_gpx(str(GPX_FILE)), distance_per_update=1.0
+        ).total_distance / 1000
+        expected_eta = gpx_distance_km / GPS_SPEED_KMH * 3600
+        logger.info(f"Route {gpx_distance_km:.2f} km, expected ETA {expected_eta:.0f}s")
 
         total_elapsed = 0
+        last_shot_time = 0
+        last_shot_pss = initial_mem.total_pss_mb
         arrived = False
 
-        for _ in range(TOTAL_DRIVE_TIME // 5):
-            time.sleep(5)
-            total_elapsed += 5
-
-            current_mem = mem_monitor._snapshots[-1].total_pss_mb if mem_monitor._snapshots else 0
-
-            # Check for arrival
+        while total_elapsed < TOTAL_DRIVE_TIME:
+            if total_elapsed < ARRIVAL_FINE_FROM * expected_eta:
+                interval = ARRIVAL_POLL_COARSE
+            else:
+                interval = ARRIVAL_POLL_FINE
+            interval = min(interval, TOTAL_DRIVE_TIME - total_elapsed)
+            time.sleep(interval)
+            total_elapsed += interval
+            if total_elapsed >= BASELINE_SECONDS:
+                mem_monitor.set_interval(MEMORY_INTERVAL_STEADY)
+
+            current_mem = mem_monitor.latest_pss_mb
+
+            # Check for arrival. find_elements returns [] on a miss instead of
+            # raising, and with implicit wait 0 it does not wait either
             try:
-                elem = driver.find_element(
-                    AppiumBy.XPATH, "//*[contains(@text, 'reached your destination')]"
-                )
-                if elem:
+                if driver.find_elements(*LOCATORS["arrived"]):
                     logger.info(f"{total_elapsed}s | {current_mem:.1f} MB | ARRIVED!")
                     arrived = True
-                    driver.save_screenshot(str(screenshots_dir / f"{total_elapsed}s_arrived.png"))
+                    driver.save_screenshot(f"{screenshots_prefix}{total_elapsed}s_arrived.png")
 
                     if ui_verifier:
                         app.capture_ui_elements(ui_verifier, "arrived")
 
-                    try:
-                        close_btn = driver.find_element(AppiumBy.XPATH, "//*[@text='Close']")
-                        close_btn.click()
-                    except Exception:
-                        pass
+                    close_buttons = driver.find_elements(*LOCATORS["close"])
+                    if close_buttons:
+                        try:
+                            close_buttons[0].click()
+                        except StaleElementReferenceException:
+                            pass  # dialog already gone
 
                     driver.terminate_app(ROADLORDS_PACKAGE)
                     break
             except Exception:
                 pass
 
-            # Take screenshot every 20 seconds
-            if total_elapsed % 20 == 0:
-                driver.save_screenshot(str(screenshots_dir / f"{total_elapsed}s_navigation.png"))
+            # Take a screenshot when memory moved noticeably, or after a long gap
+            if (total_elapsed - last_shot_time >= SCREENSHOT_MAX_GAP
+                    or abs(current_mem - last_shot_pss) > SCREENSHOT_PSS_DELTA_MB):
+                screenshot_pool.submit(adb.screenshot, f"{screenshots_prefix}{total_elapsed}s_navigation.png")
+                last_shot_time = total_elapsed
+                last_shot_pss = current_mem
 
             logger.info(f"{total_elapsed}s | {current_mem:.1f} MB | navigating...")
 
         # --- Step 8: Generate report ---
-        logger.info("=" * 50)
-        logger.info("STEP 8: Generating report")
+        logger.info("%s\nSTEP %d: %s", LOG_BANNER, 8, "Generating report")
+        screenshot_pool.shutdown(wait=True)  # the report embeds the screenshots
         gps.stop()
         report = mem_monitor.stop()
         video_path = video_recorder.stop()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        csv_path = reports_dir / f"memory_{timestamp}.csv"
+        csv_path = E2E_REPORTS_DIR / f"memory_{timestamp}.csv"
         report.to_csv(csv_path)
 
         html_report = generate_report_from_test_data(
@@ -570,23 +635,22 @@ def run_test():
             recompute_events=[],
             baseline_duration=BASELINE_SECONDS,
             deviation_duration=total_elapsed - BASELINE_SECONDS,
-            output_dir=reports_dir,
+            output_dir=E2E_REPORTS_DIR,
             video_path=video_path,
             ui_verifier=ui_verifier
         )
 
         if ui_verifier:
-            if UI_VERIFY_MODE == "capture":
+            if actual_ui_mode == "capture":
                 ui_verifier.save_baseline()
                 logger.info("Baseline saved")
-            elif UI_VERIFY_MODE == "verify":
+            elif actual_ui_mode == "verify":
                 for checkpoint in ui_verifier.current_elements.keys():
                     ui_verifier.verify_checkpoint(checkpoint)
                 summary = ui_verifier.get_summary()
                 logger.info(f"UI Verification: {summary['status'].upper()}")
 
-        logger.info("=" * 50)
-        logger.info("TEST COMPLETED!")
+        logger.info("%s\nTEST COMPLETED!", LOG_BANNER)
         logger.info(f"Report: {html_report}")
         if video_path:
             logger.info(f"Video: {video_path}")
@@ -599,6 +663,9 @@ def run_test():
 
     finally:
         gps.stop()
+        gps.close()
+        if screenshot_pool:
+            screenshot_pool.shutdown(wait=True)
         if video_recorder and video_recorder.is_recording:
             try:
                 video_recorder.stop()
@@ -615,6 +682,7 @@ def run_test():
             except Exception:
                 pass
             driver.quit()
+        adb_shell.close()
 
 
 if __name__ == "__main__":